@@ -0,0 +1,264 @@
+import argparse
+import datetime
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# Activity level (dial) histogram bins over the 10 bit ADC range
+DIAL_BINS = np.linspace(0, 1024, 9)
+# A submission marks areas as occupied until the next one, for at most this long
+MAX_HOLD = 3600.0
+
+# Bump when the aggregates change, so older cache files are recomputed
+CACHE_VERSION = 2
+LOG_FILE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.(samples|submissions)(-\d+)?\.csv$")
+CACHE_DIR = ".cache"
+
+
+def find_log_files(log_dir):
+    """Map (panel, day) to the sample and submission files logged for it."""
+    days = {}
+    for panel in sorted(os.listdir(log_dir)):
+        panel_dir = os.path.join(log_dir, panel)
+        if panel == CACHE_DIR or not os.path.isdir(panel_dir):
+            continue
+        for name in sorted(os.listdir(panel_dir)):
+            match = LOG_FILE.match(name)
+            if match:
+                files = days.setdefault((panel, match.group(1)), {"samples": [], "submissions": []})
+                files[match.group(2)].append(os.path.join(panel_dir, name))
+    return days
+
+
+def read_columns(path):
+    """Read a log file into its header and a 2D array with one column per field."""
+    with open(path) as f:
+        header = f.readline().strip().split(",")
+    try:
+        data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    except ValueError:
+        # A row cut short, e.g. by a power cut, so parse row by row and skip it
+        rows = []
+        bad = 0
+        with open(path) as f:
+            next(f)
+            for line in f:
+                fields = line.strip().split(",")
+                try:
+                    if len(fields) != len(header):
+                        raise ValueError(line)
+                    rows.append([float(field) for field in fields])
+                except ValueError:
+                    bad += 1
+        print(f"Warning: Skipped {bad} bad rows in {path}")
+        data = np.array(rows).reshape(-1, len(header))
+    if data.size == 0:
+        data = np.empty((0, len(header)))
+    return header, data
+
+
+def hours_of(timestamps, midnight):
+    """Local hour of the day (0-23) of each timestamp."""
+    return np.clip(((timestamps - midnight) // 3600).astype(int), 0, 23)
+
+
+def aggregate_day(panel, day, files):
+    """Compute the hourly aggregates of one panel for one day."""
+    midnight = datetime.datetime.strptime(day, "%Y-%m-%d").timestamp()
+    hour_starts = midnight + 3600 * np.arange(24)
+
+    # Readings
+    sample_chunks = [read_columns(path)[1] for path in files["samples"]]
+    samples = np.concatenate(sample_chunks) if sample_chunks else np.empty((0, 4))
+    sample_hours = hours_of(samples[:, 0], midnight)
+
+    # Submissions, with the area columns of every file aligned by name
+    areas = []
+    chunks = []
+    for path in files["submissions"]:
+        header, data = read_columns(path)
+        for area in header[2:]:
+            if area not in areas:
+                areas.append(area)
+        chunks.append((header[2:], data))
+    times = np.concatenate([data[:, 0] for _, data in chunks]) if chunks else np.empty(0)
+    dial = np.concatenate([data[:, 1] for _, data in chunks]) if chunks else np.empty(0)
+    active = np.zeros((len(times), len(areas)))
+    row = 0
+    for columns, data in chunks:
+        for i, area in enumerate(columns):
+            active[row:row + len(data), areas.index(area)] = data[:, 2 + i]
+        row += len(data)
+    order = np.argsort(times, kind="stable")
+    times, dial, active = times[order], dial[order], active[order]
+
+    # Each submission holds until the next one, or for the last one until
+    # the last logged time, capped at MAX_HOLD. The held time is split over
+    # the hours it covers.
+    hours = hours_of(times, midnight)
+    last_logged = max(times.max(initial=midnight), samples[:, 0].max(initial=midnight))
+    held_until = times + np.minimum(np.diff(times, append=last_logged), MAX_HOLD)
+    overlap = np.clip(np.minimum(held_until[:, None], hour_starts + 3600)
+                      - np.maximum(times[:, None], hour_starts), 0, None)
+    occupied = overlap.T @ active
+
+    return {
+        "panel": panel,
+        "day": day,
+        "areas": areas,
+        "submissions": int(len(times)),
+        "submissions_per_hour": np.bincount(hours, minlength=24).tolist(),
+        "held_seconds_per_hour": overlap.sum(axis=0).tolist(),
+        "occupied_seconds": {area: occupied[:, i].tolist() for i, area in enumerate(areas)},
+        "active_submissions": {area: int(active[:, i].sum()) for i, area in enumerate(areas)},
+        "dial_histogram": np.histogram(dial, DIAL_BINS)[0].tolist(),
+        "dial_sum": float(dial.sum()),
+        "samples_per_hour": np.bincount(sample_hours, minlength=24).tolist(),
+        "sample_sums": {
+            name: np.bincount(sample_hours, weights=samples[:, i + 1], minlength=24).tolist()
+            for i, name in enumerate(("distance", "dial", "light"))
+        },
+    }
+
+
+def sources_of(files):
+    """Modification time and size of each file, to tell when a cached day is stale."""
+    return {
+        path: [os.stat(path).st_mtime, os.stat(path).st_size]
+        for path in files["samples"] + files["submissions"]
+    }
+
+
+def load_day(task):
+    """Return the aggregates of a day from the cache, computing them if needed."""
+    panel, day, files, cache_path = task
+    sources = sources_of(files)
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get("version") == CACHE_VERSION and cached["sources"] == sources:
+            return cached["aggregate"], False
+    except (OSError, ValueError, KeyError):
+        pass
+
+    aggregate = aggregate_day(panel, day, files)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp = cache_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "sources": sources, "aggregate": aggregate}, f)
+    os.replace(tmp, cache_path)
+    return aggregate, True
+
+
+def period_of(day, period):
+    """Report period a day belongs to."""
+    if period == "daily":
+        return day
+    year, week, _ = datetime.date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def combine(aggregates, period):
+    """Sum day aggregates into one report entry per panel and period."""
+    reports = {}
+    for aggregate in aggregates:
+        key = (aggregate["panel"], period_of(aggregate["day"], period))
+        report = reports.setdefault(key, {
+            "panel": key[0],
+            "period": key[1],
+            "days": 0,
+            "submissions": 0,
+            "submissions_per_hour": np.zeros(24),
+            "samples_per_hour": np.zeros(24),
+            "open_hours": 0,
+            "occupied_seconds": {},
+            "active_submissions": {},
+            "dial_histogram": np.zeros(len(DIAL_BINS) - 1),
+            "dial_sum": 0.0,
+        })
+        submissions_per_hour = np.array(aggregate["submissions_per_hour"])
+        samples_per_hour = np.array(aggregate["samples_per_hour"])
+        held_per_hour = np.array(aggregate["held_seconds_per_hour"])
+        report["days"] += 1
+        report["submissions"] += aggregate["submissions"]
+        report["submissions_per_hour"] += submissions_per_hour
+        report["samples_per_hour"] += samples_per_hour
+        # Hours with any panel traffic or a selection in force count as
+        # opening hours, so an area is never occupied longer than they last
+        report["open_hours"] += int(np.count_nonzero(submissions_per_hour + samples_per_hour
+                                                     + held_per_hour))
+        for area, seconds in aggregate["occupied_seconds"].items():
+            report["occupied_seconds"][area] = report["occupied_seconds"].get(area, 0.0) + sum(seconds)
+            report["active_submissions"][area] = (report["active_submissions"].get(area, 0)
+                                                  + aggregate["active_submissions"][area])
+        report["dial_histogram"] += np.array(aggregate["dial_histogram"])
+        report["dial_sum"] += aggregate["dial_sum"]
+
+    for report in reports.values():
+        hourly = report["submissions_per_hour"]
+        report["peak_hour"] = int(np.argmax(hourly)) if hourly.any() else None
+        report["mean_activity"] = report["dial_sum"] / report["submissions"] if report["submissions"] else None
+        report["utilisation"] = {
+            area: seconds / (report["open_hours"] * 3600) if report["open_hours"] else 0.0
+            for area, seconds in report["occupied_seconds"].items()
+        }
+        for name in ("submissions_per_hour", "samples_per_hour", "dial_histogram"):
+            report[name] = report[name].astype(int).tolist()
+    return [reports[key] for key in sorted(reports)]
+
+
+def print_report(report):
+    """Print one panel and period in a readable table."""
+    print(f"== {report['panel']}  {report['period']}  ({report['days']} days) ==")
+    peak = report["peak_hour"]
+    print(f"  submissions: {report['submissions']}   readings: {sum(report['samples_per_hour'])}   "
+          f"peak hour: {f'{peak:02d}:00' if peak is not None else '-'}   open hours: {report['open_hours']}")
+    if report["occupied_seconds"]:
+        width = max(len(area) for area in report["occupied_seconds"])
+        print(f"  {'area':<{width}}  occupied h  utilisation  active in")
+        for area, seconds in report["occupied_seconds"].items():
+            share = report["active_submissions"][area] / report["submissions"] if report["submissions"] else 0.0
+            print(f"  {area:<{width}}  {seconds / 3600:10.1f}  {report['utilisation'][area]:11.0%}  {share:9.0%}")
+    if report["mean_activity"] is not None:
+        print(f"  activity level: mean {report['mean_activity']:.0f}, "
+              f"distribution {report['dial_histogram']} (low to high)")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Usage report from logged touchpoint panel data.")
+    parser.add_argument("--logs", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs"),
+                        help="log directory written by the panels")
+    parser.add_argument("--period", choices=("daily", "weekly"), default="daily")
+    parser.add_argument("--since", help="first day to include (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last day to include (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    options = parser.parse_args()
+
+    tasks = [
+        (panel, day, files, os.path.join(options.logs, CACHE_DIR, panel, f"{day}.json"))
+        for (panel, day), files in sorted(find_log_files(options.logs).items())
+        if (not options.since or day >= options.since) and (not options.until or day <= options.until)
+    ]
+
+    # Days are independent, so they are spread over a process pool
+    with ProcessPoolExecutor(max_workers=options.workers) as pool:
+        results = list(pool.map(load_day, tasks))
+    computed = sum(1 for _, fresh in results if fresh)
+
+    reports = combine([aggregate for aggregate, _ in results], options.period)
+    if options.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print_report(report)
+        print(f"{len(tasks)} panel days, {computed} computed, {len(tasks) - computed} from cache")
+
+
+if __name__ == "__main__":
+    main()
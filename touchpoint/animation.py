@@ -0,0 +1,59 @@
+def linear(t):
+    """No easing."""
+    return t
+
+def ease_out_cubic(t):
+    """Start fast and slow down towards the end."""
+    return 1 - (1 - t) ** 3
+
+def ease_in_out_quad(t):
+    """Speed up through the first half and slow down through the second."""
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+
+class Animator:
+    """Time based tweens of numeric attributes, evaluated together each frame.
+
+    All running animations live in one list and are advanced in a single pass
+    by update(). Progress depends only on the time passed in, so animations
+    look the same at any frame rate, and objects that are not animating are
+    never touched.
+    """
+
+    def __init__(self):
+        # Each entry is [target, attribute, start value, end value, start time, duration, easing]
+        self.animations = []
+
+    def animate(self, target, attr, end, duration, now, easing=ease_out_cubic):
+        """Tween target.attr from its current value to end over duration seconds."""
+        start = getattr(target, attr)
+        for i, animation in enumerate(self.animations):
+            if animation[0] is target and animation[1] == attr:
+                # Replace a running animation, starting from wherever it is now
+                del self.animations[i]
+                break
+        if duration <= 0:
+            setattr(target, attr, end)
+            return
+        self.animations.append([target, attr, start, end, now, duration, easing])
+
+    def update(self, now):
+        """Advance all animations to the given time. Return True while any are running."""
+        animations = self.animations
+        running = 0
+        for animation in animations:
+            target, attr, start, end, start_time, duration, easing = animation
+            progress = (now - start_time) / duration
+            if progress >= 1.0:
+                setattr(target, attr, end)
+                continue
+            setattr(target, attr, start + (end - start) * easing(max(0.0, progress)))
+            # Keep running animations packed at the front of the list
+            animations[running] = animation
+            running += 1
+        del animations[running:]
+        return running > 0
+
+    def is_animating(self):
+        """Return True if any animation is still running."""
+        return bool(self.animations)
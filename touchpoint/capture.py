@@ -0,0 +1,119 @@
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+import pygame
+
+
+def encode_png(pixels, width, height):
+    """Encode RGBX pixel rows, as copied from a surface, as an opaque RGBA PNG file."""
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+
+    # Every row starts with its filter type, 0 for none. The padding byte is
+    # undefined, so it is set to full opacity. NumPy builds all rows in a
+    # few array copies that release the GIL, unlike a loop over rows.
+    rows = np.empty((height, 1 + width * 4), np.uint8)
+    rows[:, 0] = 0
+    rows[:, 1:] = np.frombuffer(pixels, np.uint8).reshape(height, width * 4)
+    rows[:, 4::4] = 255
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows, 6))
+            + chunk(b"IEND", b""))
+
+
+class ScreenCapture:
+    """Save a screenshot of the display every few seconds without stalling rendering.
+
+    The render loop only copies the frame into a bytes object, in the
+    RGBX format that pygame copies without converting pixels. A worker
+    thread compresses it (zlib releases the GIL while it works) and writes
+    <directory>/<time>.png and latest.png through a temporary file, so a
+    monitoring script never sees a half written image. Only the newest
+    "keep" timestamped screenshots are kept. If the worker is still busy
+    when the next capture is due, that capture is skipped, so at most one
+    frame is held in memory.
+    """
+
+    def __init__(self, directory, interval=60.0, keep=60):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.interval = interval
+        self.keep = keep
+        self.next_capture = None
+        self.queue = queue.Queue()
+        self.busy = False  # Set while the worker has a frame
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+        # Statistics
+        self.captures = 0
+        self.skipped = 0
+
+    def update(self, now, timestamp, surface):
+        """Hand a copy of the surface to the worker if a capture is due."""
+        if self.next_capture is not None and now < self.next_capture:
+            return
+        self.next_capture = now + self.interval
+        if self.busy:
+            self.skipped += 1
+            return
+        self.busy = True
+        pixels = pygame.image.tobytes(surface, "RGBX")
+        self.queue.put((timestamp, pixels, surface.get_size()))
+
+    def _run(self):
+        """Worker loop: encode and write frames until a None arrives."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            timestamp, pixels, (width, height) = item
+            try:
+                png = encode_png(pixels, width, height)
+                name = time.strftime("%Y-%m-%d_%H%M%S", time.localtime(timestamp)) + ".png"
+                self._write(name, png)
+                self._write("latest.png", png)
+                self._prune()
+                self.captures += 1
+            except OSError as e:
+                print(f"Warning: Could not save screenshot: {e}")
+            finally:
+                self.busy = False
+
+    def _write(self, name, data):
+        """Write a file atomically."""
+        path = os.path.join(self.directory, name)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _prune(self):
+        """Delete the oldest screenshots beyond the retention limit."""
+        if not self.keep:
+            return
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.endswith(".png") and name != "latest.png")
+        for name in names[:-self.keep]:
+            os.remove(os.path.join(self.directory, name))
+
+    def close(self):
+        """Finish the pending screenshot and stop the worker."""
+        self.queue.put(None)
+        self.worker.join()
+
+
+def open_screen_capture(layout, base_dir):
+    """Create the ScreenCapture configured in a layout's "capture" section, or None."""
+    settings = layout.data.get("capture")
+    if not settings:
+        return None
+    return ScreenCapture(os.path.join(base_dir, settings.get("dir", "captures")),
+                         settings.get("interval", 60.0), settings.get("keep", 60))
@@ -0,0 +1,81 @@
+class ChangeDetector:
+    """Deadband and hysteresis filter that reports only meaningful changes.
+
+    A new value is reported when it differs from the last reported value by
+    more than the deadband. Reversing direction needs an extra hysteresis
+    margin on top of that, so a reading hovering around a step does not flip
+    back and forth. Counters record how many updates were reported and how
+    many were suppressed.
+    """
+
+    def __init__(self, deadband=2, hysteresis=1):
+        self.deadband = deadband
+        self.hysteresis = hysteresis
+        self.value = None  # Last reported value
+        self.direction = 0  # Direction of the last reported change: -1, 0 or 1
+        self.changes = 0
+        self.suppressed = 0
+
+    def update(self, value):
+        """Feed a filtered value and return True if it should be reported."""
+        if self.value is None:
+            self.value = value
+            self.changes += 1
+            return True
+
+        delta = value - self.value
+        direction = (delta > 0) - (delta < 0)
+        threshold = self.deadband
+        if self.direction and direction != self.direction:
+            threshold += self.hysteresis
+
+        if abs(delta) <= threshold:
+            self.suppressed += 1
+            return False
+
+        self.value = value
+        self.direction = direction
+        self.changes += 1
+        return True
+
+
+class SmoothedChannel:
+    """Moving average of one analog channel, gated by a ChangeDetector."""
+
+    def __init__(self, window_size=10, deadband=2, hysteresis=1):
+        self.values = []
+        self.window_size = window_size  # Smoothing window
+        self.value = 0
+        self.change = ChangeDetector(deadband, hysteresis)  # Ignore ADC jitter
+
+    def update(self, new_value):
+        """Smooth sensor data by averaging the last few readings.
+
+        Returns True when the smoothed value moved past the deadband, which is
+        the only time self.value changes.
+        """
+        self.values.append(new_value)
+        if len(self.values) > self.window_size:
+            self.values.pop(0)
+        smoothed = sum(self.values) / len(self.values)
+        if self.change.update(smoothed):
+            self.value = smoothed
+            return True
+        return False
+
+    def restore(self, other):
+        """Carry over the readings of a channel this one replaces."""
+        self.values = other.values[-self.window_size:]
+        self.value = other.value
+        self.change.value = other.change.value
+
+
+def create_channels(bars, previous=()):
+    """Create a channel for each sensor bar entry of a layout."""
+    channels = [
+        SmoothedChannel(bar.get("window_size", 10), bar.get("deadband", 2), bar.get("hysteresis", 1))
+        for bar in bars
+    ]
+    for channel, old in zip(channels, previous):
+        channel.restore(old)
+    return channels
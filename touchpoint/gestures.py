@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+
+TAP = "tap"
+DOUBLE_TAP = "double_tap"
+LONG_PRESS = "long_press"
+SWIPE = "swipe"
+KINDS = (TAP, DOUBLE_TAP, LONG_PRESS, SWIPE)  # Numbered in this order in shared memory
+
+# The pad a gesture ended on, and for a swipe the pad it started on
+Gesture = namedtuple("Gesture", "kind pad start")
+
+
+class GestureRecognizer:
+    """Turn the stream of touched pads into tap, double tap, long press and swipe gestures.
+
+    Feed it every sample with the touched pad, or -1 when none is touched.
+    A tap is reported on the sample the pad goes down, and a second tap on
+    the same pad within "double_tap" seconds is a double tap instead. A pad
+    let go for less than "bounce" seconds counts as still held, so contact
+    bounce is not a second tap. A pad held for "long_press" seconds reports
+    one long press, which also ends any swipe. Moving straight to a
+    neighbouring pad, or touching it within "swipe_gap" seconds of letting
+    go, continues a swipe. Every gesture is reported on the sample that
+    completes it, and each sample only touches the state of one pad.
+    """
+
+    def __init__(self, num_pads, settings=None):
+        settings = settings or {}
+        self.num_pads = num_pads
+        self.long_press = settings.get("long_press", 0.8)
+        self.double_tap = settings.get("double_tap", 0.4)
+        self.swipe_gap = settings.get("swipe_gap", 0.15)
+        self.bounce = settings.get("bounce", 0.05)
+
+        self.last_tap = [float("-inf")] * num_pads
+        # The current hold: pad, when it went down, whether a long press was
+        # reported (or is not wanted), and whether a swipe may continue from it
+        self.pad = -1
+        self.down_since = 0.0
+        self.long_pressed = False
+        self.can_swipe = False
+        # The last hold that ended, as (pad, down_since, long_pressed, can_swipe)
+        self.released = (-1, 0.0, False, False)
+        self.released_at = float("-inf")
+        self.swipe_start = -1
+
+    def restore(self, other):
+        """Carry over the touch state of a recognizer this one replaces."""
+        self.last_tap = list(other.last_tap)
+        self.pad = other.pad
+        self.down_since = other.down_since
+        self.long_pressed = other.long_pressed
+        self.can_swipe = other.can_swipe
+        self.released = other.released
+        self.released_at = other.released_at
+        self.swipe_start = other.swipe_start
+
+    def update(self, now, pad):
+        """Feed one sample and return the Gesture it completes, or None."""
+        if not 0 <= pad < self.num_pads:
+            pad = -1
+        if pad == self.pad:
+            # Still held (or still nothing touched)
+            if pad >= 0 and not self.long_pressed and now - self.down_since >= self.long_press:
+                self.long_pressed = True
+                # The selection is cleared, so nothing may be swiped onto it
+                self.can_swipe = False
+                self.swipe_start = -1
+                return Gesture(LONG_PRESS, pad, pad)
+            return None
+
+        if self.pad >= 0:
+            self.released = (self.pad, self.down_since, self.long_pressed, self.can_swipe)
+            self.released_at = now
+        released_pad, down_since, long_pressed, can_swipe = self.released
+        if pad >= 0 and pad == released_pad and now - self.released_at < self.bounce:
+            # Contact bounce, the pad was never really let go
+            self.pad = pad
+            self.down_since = down_since
+            self.long_pressed = long_pressed
+            self.can_swipe = can_swipe
+            return None
+
+        self.pad = pad
+        self.down_since = now
+        self.long_pressed = False
+        self.can_swipe = True
+        if pad < 0:
+            return None
+
+        if (can_swipe and abs(pad - released_pad) == 1
+                and now - self.released_at <= self.swipe_gap):
+            if self.swipe_start < 0:
+                self.swipe_start = released_pad
+            # Resting at the end of a swipe is not a long press
+            self.long_pressed = True
+            return Gesture(SWIPE, pad, self.swipe_start)
+        self.swipe_start = -1
+
+        if now - self.last_tap[pad] <= self.double_tap:
+            self.last_tap[pad] = float("-inf")  # A third tap starts over
+            return Gesture(DOUBLE_TAP, pad, pad)
+        self.last_tap[pad] = now
+        return Gesture(TAP, pad, pad)
+
+    def poll(self, now):
+        """Check the held pad between samples, so long presses are not late."""
+        return self.update(now, self.pad)
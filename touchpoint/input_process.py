@@ -0,0 +1,142 @@
+import os
+import signal
+import subprocess
+import sys
+
+from filters import create_channels
+from gestures import GestureRecognizer
+from layout import LayoutWatcher
+from panel_log import open_panel_log
+from serial_input import PanelConnection, parse_line
+from shared_state import NUM_CHANNELS, NUM_PADS, SharedPanelState
+from timebase import SystemClock
+
+
+def run(state_name, port, baudrate, layout_path, clock=None):
+    """Read the panel, filter its readings and publish them to shared memory."""
+    clock = clock or SystemClock()
+    state = SharedPanelState(state_name)
+    layout_watcher = LayoutWatcher(layout_path)
+    channels = create_channels(layout_watcher.layout.sensor_bars)
+    gestures = GestureRecognizer(NUM_PADS, layout_watcher.layout.data.get("gestures"))
+
+    serial_reader = PanelConnection(port, baudrate)
+    panel_log = open_panel_log(layout_watcher.layout, os.path.dirname(os.path.abspath(__file__)))
+
+    # Continue the press count of a previous input process
+    button_presses = state.button_presses
+    button_down = False
+    try:
+        while True:
+            # Filter settings live with the sensor bars in the layout file
+            now = clock.now()
+            changed_sections = layout_watcher.poll(now)
+            if "sensor_bars" in changed_sections:
+                channels = create_channels(layout_watcher.layout.sensor_bars, channels)
+            if "gestures" in changed_sections:
+                previous = gestures
+                gestures = GestureRecognizer(NUM_PADS, layout_watcher.layout.data.get("gestures"))
+                gestures.restore(previous)
+
+            # A held pad can become a long press between reports
+            changed = False
+            gesture = gestures.poll(now)
+            if gesture is not None:
+                state.add_gesture(gesture)
+                changed = True
+
+            lines = serial_reader.read_lines(now)
+            for line in lines:
+                try:
+                    data = parse_line(line)
+                except ValueError:
+                    print("Warning: Invalid or incomplete data received")
+                    continue
+
+                # Recognize gestures here at the full input rate, the render
+                # process applies them
+                gesture = gestures.update(now, data[3])
+                if gesture is not None:
+                    state.add_gesture(gesture)
+                    changed = True
+
+                values_changed = False
+                for channel, value in zip(channels, data[:NUM_CHANNELS]):
+                    if channel.update(value):
+                        values_changed = True
+                if values_changed:
+                    changed = True
+                    if panel_log is not None:
+                        panel_log.log_sample(clock.timestamp(), [channel.value for channel in channels])
+
+                # Count presses rather than reports of a held button
+                pressed = data[4] == 0
+                if pressed and not button_down:
+                    button_presses += 1
+                    changed = True
+                button_down = pressed
+
+            if changed:
+                values = [channel.value for channel in channels[:NUM_CHANNELS]]
+                values += [0.0] * (NUM_CHANNELS - len(values))
+                state.publish(values, button_presses)
+            elif not lines:
+                clock.sleep(0.002)
+    finally:
+        # Report how much sensor jitter the deadbands filtered out
+        for bar, channel in zip(layout_watcher.layout.sensor_bars, channels):
+            change = channel.change
+            print(f"{bar['label']}: {change.changes} changes, {change.suppressed} updates suppressed")
+        serial_reader.close()
+        if panel_log is not None:
+            panel_log.close()
+        state.close()
+
+
+class InputProcess:
+    """Serial input running in a separate interpreter, sharing its state.
+
+    The input side owns the serial port and the filters, and publishes into a
+    SharedPanelState that the render loop reads without locking, so neither
+    side's pauses hold up the other. If the input process exits, a warning
+    is printed and it is started again after retry_interval seconds.
+    """
+
+    def __init__(self, port, baudrate, layout_path, retry_interval=5.0):
+        self.state = SharedPanelState()
+        self.command = [
+            sys.executable, os.path.abspath(__file__),
+            self.state.name, port, str(baudrate), os.path.abspath(layout_path),
+        ]
+        self.retry_interval = retry_interval
+        self.restart_at = None
+        self.restarts = 0
+        self.process = subprocess.Popen(self.command)
+
+    def read(self, now):
+        """Latest consistent panel state, or None. Restarts the input process if it died."""
+        if self.process.poll() is not None:
+            if self.restart_at is None:
+                print(f"Warning: Input process exited with code {self.process.returncode}, "
+                      f"restarting in {self.retry_interval:g}s")
+                self.restart_at = now + self.retry_interval
+            elif now >= self.restart_at:
+                self.restart_at = None
+                self.restarts += 1
+                self.process = subprocess.Popen(self.command)
+        return self.state.read()
+
+    def close(self):
+        """Stop the input process and release the shared memory."""
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.state.close()
+
+
+if __name__ == "__main__":
+    # Exit through the finally block above so the port and memory are released
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    run(sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4])
@@ -0,0 +1,246 @@
+import json
+import os
+import pygame
+
+from spatial import GridIndex
+
+
+# Top level sections of a layout file. Each one maps to a cached layer or an
+# object in the visualization, so a reload only rebuilds what its section
+# changed.
+SECTIONS = ("window", "touchpoints", "sensor_bars", "text_boxes", "presence", "gestures")
+
+
+def load_font(spec, scale=1.0):
+    """Create a pygame font from a {"name", "size", "bold"} layout entry."""
+    size = max(1, round(spec["size"] * scale))
+    if spec.get("name") is None:
+        return pygame.font.Font(None, size)
+    return pygame.font.SysFont(spec["name"], size, bold=spec.get("bold", False))
+
+
+def wrap_text(text, font, width, padding=20):
+    """Split text into lines that fit inside a text box of the given width."""
+    words = text.split(' ')
+    lines = []
+    current_line = ''
+
+    for word in words:
+        # Add current word to the line
+        test_line = current_line + word + ' '
+
+        # Check if the line exceeds the text box width
+        if font.size(test_line)[0] < width - padding:
+            current_line = test_line
+        else:
+            # Start a new line
+            lines.append(current_line)
+            current_line = word + ' '
+
+    # Append the last line
+    if current_line:
+        lines.append(current_line)
+    return lines
+
+
+def _check_number(value, name):
+    """Raise TypeError unless a layout value is a number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"{name} must be a number, not {value!r}")
+
+
+def _check_color(value, name):
+    """Raise ValueError unless a layout value is an [r, g, b] list."""
+    if not (isinstance(value, list) and len(value) in (3, 4)
+            and all(isinstance(c, int) and 0 <= c <= 255 for c in value)):
+        raise ValueError(f"{name} must be an [r, g, b] list, not {value!r}")
+
+
+def _check_font(spec, name):
+    """Raise unless a layout value is a {"name", "size", "bold"} font entry."""
+    _check_number(spec["size"], f"{name} size")
+    if spec.get("name") is not None and not isinstance(spec["name"], str):
+        raise TypeError(f"{name} name must be a string or null")
+
+
+class Layout:
+    """Screen layout loaded from a JSON file, with its geometry precomputed."""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+
+        window = data["window"]
+        self.width = window["width"]
+        self.height = window["height"]
+        self.caption = window.get("caption", "Touch Points Visualization")
+
+        touchpoints = data["touchpoints"]
+        self.touch_point_size = touchpoints["size"]
+        self.label_offset = touchpoints.get("label_offset", 30)
+        self.touchpoint_positions = {
+            label: [tuple(position) for position in positions]
+            for label, positions in touchpoints["positions"].items()
+        }
+
+        self.sensor_bars = data["sensor_bars"]["bars"]
+        self.text_boxes = data.get("text_boxes", [])
+
+        # Entries that are only read when layers are drawn are checked now,
+        # so a broken edit is rejected on load rather than in the main loop
+        _check_number(self.width, "window width")
+        _check_number(self.height, "window height")
+        _check_font(touchpoints["label_font"], "touchpoints label_font")
+        _check_font(data["sensor_bars"]["font"], "sensor_bars font")
+        for bar in self.sensor_bars:
+            if not isinstance(bar["label"], str):
+                raise TypeError(f"sensor bar label must be a string, not {bar['label']!r}")
+            _check_color(bar["color"], f"{bar['label']} color")
+            for key in ("x", "y", "deadband", "hysteresis", "window_size"):
+                if key in ("x", "y") or key in bar:
+                    _check_number(bar[key], f"{bar['label']} {key}")
+        for box in self.text_boxes:
+            if not isinstance(box["text"], str):
+                raise TypeError(f"text box text must be a string, not {box['text']!r}")
+            _check_font(box["font"], "text box font")
+            _check_color(box["text_color"], "text box text_color")
+            _check_color(box["border_color"], "text box border_color")
+            for key in ("x", "y", "width", "height", "border_thickness"):
+                _check_number(box[key], f"text box {key}")
+        for section in ("presence", "gestures", "capture"):
+            for key, value in data.get(section, {}).items():
+                if value is not None and key != "dir":
+                    _check_number(value, f"{section} {key}")
+
+        # Geometry in logical layout units, computed once per load
+        self.touch_groups = [
+            index
+            for index, positions in enumerate(self.touchpoint_positions.values())
+            for _ in positions
+        ]
+        self.touch_rects = [
+            pygame.Rect(x, y, self.touch_point_size, self.touch_point_size)
+            for positions in self.touchpoint_positions.values()
+            for x, y in positions
+        ]
+        # Active touch points grow to twice their size, so the index holds
+        # that footprint and callers confirm hits against the current size
+        self.hit_index = GridIndex(
+            pygame.Rect(rect.x, rect.y, rect.width * 2, rect.height * 2)
+            for rect in self.touch_rects
+        )
+        self.text_box_rects = [
+            pygame.Rect(box["x"], box["y"], box["width"], box["height"])
+            for box in self.text_boxes
+        ]
+
+        # Fonts and text surfaces are rendered on first use, once per load
+        # and display scale, at the native resolution of the display
+        self._fonts = {}
+        self._label_surfaces = {}
+        self._text_box_surfaces = {}
+
+    def changed_sections(self, other):
+        """Return the sections that differ between this layout and another."""
+        if other is None:
+            return set(SECTIONS)
+        return {name for name in SECTIONS if self.data.get(name) != other.data.get(name)}
+
+    def font(self, spec, scale=1.0):
+        """Font for a layout entry, cached per display scale."""
+        key = (spec.get("name"), spec["size"], spec.get("bold", False), scale)
+        if key not in self._fonts:
+            self._fonts[key] = load_font(spec, scale)
+        return self._fonts[key]
+
+    def sensor_bar_font(self, scale=1.0):
+        """Font shared by all sensor bar readouts."""
+        return self.font(self.data["sensor_bars"]["font"], scale)
+
+    def label_surfaces(self, viewport):
+        """Rendered group labels with their display positions."""
+        if viewport.key not in self._label_surfaces:
+            font = self.font(self.data["touchpoints"]["label_font"], viewport.scale)
+            surfaces = []
+            for label, positions in self.touchpoint_positions.items():
+                x, y = positions[0]
+                text = font.render(label, True, (255, 255, 255))
+                surfaces.append((text, viewport.point(x, y - self.label_offset)))
+            self._label_surfaces[viewport.key] = surfaces
+        return self._label_surfaces[viewport.key]
+
+    def text_box_surfaces(self, viewport):
+        """Rendered text box lines with their display positions."""
+        if viewport.key not in self._text_box_surfaces:
+            surfaces = []
+            for box in self.text_boxes:
+                font = self.font(box["font"], viewport.scale)
+                if box.get("wrap", False):
+                    lines = wrap_text(box["text"], font, box["width"] * viewport.scale,
+                                      padding=20 * viewport.scale)
+                else:
+                    lines = [box["text"]]
+                x, y = viewport.point(box["x"] + 10, box["y"] + 10)
+                line_height = font.get_height()
+                for i, line in enumerate(lines):
+                    text = font.render(line, True, tuple(box["text_color"]))
+                    surfaces.append((text, (x, y + i * line_height)))
+            self._text_box_surfaces[viewport.key] = surfaces
+        return self._text_box_surfaces[viewport.key]
+
+    def build_static_layer(self, viewport, background=(0, 0, 0)):
+        """Render the background, text boxes and group labels into one surface."""
+        layer = pygame.Surface((viewport.width, viewport.height))
+        layer.fill(background)
+        for box, rect in zip(self.text_boxes, self.text_box_rects):
+            pygame.draw.rect(layer, tuple(box["border_color"]),
+                             viewport.rect(rect.x, rect.y, rect.width, rect.height),
+                             viewport.length(box["border_thickness"]))
+        for text, position in self.text_box_surfaces(viewport):
+            layer.blit(text, position)
+        for text, position in self.label_surfaces(viewport):
+            layer.blit(text, position)
+        return layer
+
+
+def load_layout(path):
+    """Read and parse a layout file."""
+    with open(path) as f:
+        data = json.load(f)
+    return Layout(path, data)
+
+
+class LayoutWatcher:
+    """Reload a layout file whenever its modification time changes."""
+
+    def __init__(self, path, interval=0.5):
+        self.path = path
+        self.interval = interval  # Seconds between mtime checks
+        self.mtime = os.stat(path).st_mtime
+        self.layout = load_layout(path)
+        self.last_check = 0.0
+
+    def poll(self, now):
+        """Check the file and return the set of sections changed by a reload."""
+        if now - self.last_check < self.interval:
+            return set()
+        self.last_check = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return set()
+        if mtime == self.mtime:
+            return set()
+        self.mtime = mtime
+
+        try:
+            layout = load_layout(self.path)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            # Keep the current layout while the file is being edited
+            print(f"Warning: Could not reload layout {self.path}: {e}")
+            return set()
+
+        changed = layout.changed_sections(self.layout)
+        self.layout = layout
+        return changed
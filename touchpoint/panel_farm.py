@@ -0,0 +1,270 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import tty
+
+from print_serial import serial_ports
+from serial_input import PanelConnection, parse_line
+from shared_state import NUM_PADS
+
+
+# Reporting rules of touchpoint_panel_SP25.ino
+ANALOG_THRESHOLD = 4  # Counts an averaged reading must move to be reported
+HEARTBEAT = 1.0  # Seconds between reports when nothing changes
+ANALOG_INTERVAL = 0.04  # Seconds between reports of sensor changes only
+
+
+class VirtualPanel:
+    """One emulated touchpoint_panel_SP25.ino behind a pseudo-terminal.
+
+    The slave side of the pty is linked at a stable path, so the usual
+    serial.Serial code can open it like the real panel, and a simulated
+    disconnect replaces it with a fresh pty behind the same link.
+    """
+
+    def __init__(self, index, link_dir, options, rng):
+        self.index = index
+        self.link = os.path.join(link_dir, f"ttyPANEL{index}")
+        self.options = options
+        self.rng = rng
+
+        self.master = None
+        self.slave = None
+        self.analog = [rng.uniform(100, 900) for _ in range(3)]
+        self.reported = [-ANALOG_THRESHOLD] * 3
+        self.reported_shape = -2
+        self.reported_button = -1
+        self.last_report = float("-inf")
+        self.touch_pad = -1
+        self.touch_until = 0.0
+        self.next_sweep = 0.0
+        self.button_until = 0.0
+        self.pending = b""  # Rest of a torn line
+        self.reconnect_at = 0.0
+        self.next_disconnect = float("inf")
+
+        # Statistics
+        self.lines = 0
+        self.torn = 0
+        self.dropped = 0
+        self.disconnects = 0
+
+    def connect(self, now):
+        """Create a new pty and point the link at it."""
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)  # Like a USB serial port: no echo or line editing
+        os.set_blocking(self.master, False)
+        tmp = self.link + ".tmp"
+        os.symlink(os.ttyname(self.slave), tmp)
+        os.replace(tmp, self.link)
+        if self.options.disconnect_every > 0:
+            self.next_disconnect = now + self.options.disconnect_every
+        self.pending = b""
+
+    def disconnect(self, now):
+        """Close the pty as if the USB cable was pulled."""
+        self.close()
+        self.disconnects += 1
+        self.reconnect_at = now + self.options.reconnect_after
+
+    def step(self, now):
+        """Advance the panel by one sample and write a report if one is due."""
+        if self.master is None:
+            if now >= self.reconnect_at:
+                self.connect(now)
+            return
+        if now >= self.next_disconnect:
+            self.disconnect(now)
+            return
+
+        line = self.sample(now)
+        if line is not None:
+            self.write(line)
+
+    def sample(self, now):
+        """Simulate the sensors and return a report line or None."""
+        options = self.options
+        rng = self.rng
+
+        # Slow random walk of the averaged readings plus residual jitter
+        filtered = []
+        for i in range(3):
+            self.analog[i] = min(1023.0, max(0.0, self.analog[i] + rng.gauss(0, options.drift)))
+            filtered.append(min(1023, max(0, int(self.analog[i] + rng.gauss(0, options.noise)))))
+
+        # Touch pattern
+        if now >= self.touch_until:
+            self.touch_pad = -1
+            if options.pattern == "random" and rng.random() < options.touch_rate / options.rate:
+                self.touch_pad = rng.randrange(NUM_PADS)
+                self.touch_until = now + rng.uniform(0.1, 0.6)
+            elif options.pattern == "sweep" and now >= self.next_sweep:
+                self.touch_pad = (self.index + int(now * options.touch_rate)) % NUM_PADS
+                self.touch_until = now + 0.2
+                self.next_sweep = now + 1.0 / max(options.touch_rate, 1e-6)
+
+        if now >= self.button_until and rng.random() < options.button_rate / options.rate:
+            self.button_until = now + 0.2
+        button = 0 if now < self.button_until else 1
+
+        if not options.stream:
+            changed = any(abs(value - last) >= ANALOG_THRESHOLD
+                          for value, last in zip(filtered, self.reported))
+            since = now - self.last_report
+            if not ((changed and since >= ANALOG_INTERVAL) or self.touch_pad != self.reported_shape
+                    or button != self.reported_button or since >= HEARTBEAT):
+                return None
+
+        self.reported = filtered
+        self.reported_shape = self.touch_pad
+        self.reported_button = button
+        self.last_report = now
+        return f"{filtered[0]},{filtered[1]},{filtered[2]},{self.touch_pad},{button}\r\n".encode()
+
+    def write(self, line):
+        """Write a line, sometimes torn in two, dropping what the pty cannot take."""
+        data = self.pending + line
+        self.pending = b""
+        if self.rng.random() < self.options.torn:
+            # Send the rest with the next report, like a line split across USB packets
+            cut = self.rng.randrange(1, len(data))
+            data, self.pending = data[:cut], data[cut:]
+            self.torn += 1
+        try:
+            written = os.write(self.master, data)
+        except BlockingIOError:
+            written = 0
+        if written < len(data):
+            # Nobody is reading and the pty buffer is full
+            self.dropped += 1
+        self.lines += 1
+
+    def close(self):
+        """Remove the pty and its link."""
+        if self.master is not None:
+            os.close(self.master)
+            os.close(self.slave)
+            self.master = None
+            self.slave = None
+        if os.path.lexists(self.link):
+            os.unlink(self.link)
+
+
+def consume(links, stop, stats):
+    """Read every panel through the host's serial code and count the results."""
+    connections = [PanelConnection(link, 9600, retry_interval=0.5) for link in links]
+    while not stop.is_set():
+        now = time.monotonic()
+        busy = False
+        for connection in connections:
+            for line in connection.read_lines(now):
+                busy = True
+                try:
+                    parse_line(line)
+                    stats["parsed"] += 1
+                except ValueError:
+                    stats["invalid"] += 1
+        if not busy:
+            time.sleep(0.001)
+    stats["connects"] = sum(connection.connects for connection in connections)
+    stats["disconnects"] = sum(connection.disconnects for connection in connections)
+    for connection in connections:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Emulate touchpoint panels on pseudo-terminals for load and soak tests.")
+    parser.add_argument("--panels", type=int, default=1, help="number of virtual panels")
+    parser.add_argument("--dir", default="/tmp/touchpoint_farm", help="where to link the ports")
+    parser.add_argument("--rate", type=float, default=100.0, help="samples per second per panel")
+    parser.add_argument("--stream", action="store_true",
+                        help="report every sample instead of only changes and heartbeats")
+    parser.add_argument("--noise", type=float, default=2.0, help="reading jitter in ADC counts")
+    parser.add_argument("--drift", type=float, default=1.0, help="random walk step in ADC counts")
+    parser.add_argument("--pattern", choices=("random", "sweep", "none"), default="random",
+                        help="how pads are touched")
+    parser.add_argument("--touch-rate", type=float, default=0.5, help="touches per second")
+    parser.add_argument("--button-rate", type=float, default=0.05, help="button presses per second")
+    parser.add_argument("--torn", type=float, default=0.0, help="fraction of lines written in two parts")
+    parser.add_argument("--disconnect-every", type=float, default=0.0,
+                        help="seconds between simulated disconnects (0 for never)")
+    parser.add_argument("--reconnect-after", type=float, default=2.0,
+                        help="seconds a disconnected panel stays away")
+    parser.add_argument("--duration", type=float, default=0.0, help="seconds to run (0 for until Ctrl-C)")
+    parser.add_argument("--consume", action="store_true",
+                        help="also read all panels through the host serial code and report throughput")
+    parser.add_argument("--seed", type=int, default=None)
+    options = parser.parse_args()
+
+    if not sys.platform.startswith('linux'):
+        raise EnvironmentError('Pseudo-terminal panels need Linux')
+
+    os.makedirs(options.dir, exist_ok=True)
+    rng = random.Random(options.seed)
+    start = time.monotonic()
+    panels = [VirtualPanel(i, options.dir, options, random.Random(rng.random()))
+              for i in range(options.panels)]
+    for panel in panels:
+        panel.connect(start)
+
+    # List the panels the same way the host finds serial ports
+    links = [panel.link for panel in panels]
+    found = serial_ports([os.path.join(options.dir, "ttyPANEL*")])
+    print("Virtual panels:", [port for port in found if port in links])
+
+    stop = threading.Event()
+    stats = {"parsed": 0, "invalid": 0}
+    consumer = None
+    if options.consume:
+        consumer = threading.Thread(target=consume, args=(links, stop, stats))
+        consumer.start()
+
+    period = 1.0 / options.rate
+    next_step = start
+    next_report = start + 5.0
+    try:
+        while not options.duration or time.monotonic() - start < options.duration:
+            now = time.monotonic()
+            for panel in panels:
+                panel.step(now)
+
+            if now >= next_report:
+                next_report += 5.0
+                lines = sum(panel.lines for panel in panels)
+                print(f"{now - start:7.1f}s  {lines} lines sent  "
+                      f"{sum(panel.dropped for panel in panels)} dropped  "
+                      f"{sum(panel.disconnects for panel in panels)} disconnects"
+                      + (f"  {stats['parsed']} parsed  {stats['invalid']} invalid" if consumer else ""))
+
+            # Keep the sample rate even when a step runs late
+            next_step += period
+            delay = next_step - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_step = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        if consumer is not None:
+            consumer.join()
+        for panel in panels:
+            panel.close()
+
+    elapsed = time.monotonic() - start
+    lines = sum(panel.lines for panel in panels)
+    print(f"Sent {lines} lines in {elapsed:.1f}s ({lines / elapsed:.0f} lines/s), "
+          f"{sum(panel.torn for panel in panels)} torn, {sum(panel.dropped for panel in panels)} dropped, "
+          f"{sum(panel.disconnects for panel in panels)} disconnects")
+    if consumer is not None:
+        print(f"Host parsed {stats['parsed']} lines, {stats['invalid']} invalid, "
+              f"{stats['connects']} connects, {stats['disconnects']} disconnects detected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import csv
+import os
+import time
+
+
+SAMPLE_FIELDS = ["time", "distance", "dial", "light"]
+
+
+def day_of(timestamp):
+    """Local date of a timestamp as used in log file names."""
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+class PanelLog:
+    """Append panel readings and submissions to daily CSV files.
+
+    Files live in <directory>/<panel>/ as <day>.samples.csv, one row per
+    reported sensor change, and <day>.submissions.csv, one row per enter
+    button press with the dial value and a 0/1 column per area. Rows are
+    written line buffered so a crash loses at most the current line.
+    """
+
+    def __init__(self, directory, panel, areas):
+        self.directory = os.path.join(directory, panel)
+        os.makedirs(self.directory, exist_ok=True)
+        self.areas = list(areas)
+        self.files = {}  # kind -> (day, file, csv writer)
+
+    def _writer(self, kind, timestamp, header):
+        """CSV writer for today's file of a kind, opening a new one after midnight."""
+        day = day_of(timestamp)
+        current = self.files.get(kind)
+        if current is not None and current[0] == day:
+            return current[2]
+        if current is not None:
+            current[1].close()
+
+        path = os.path.join(self.directory, f"{day}.{kind}.csv")
+        if os.path.exists(path):
+            with open(path, newline="") as f:
+                existing = next(csv.reader(f), None)
+            if existing != header:
+                # The columns changed with the layout, keep them in a separate file
+                path = os.path.join(self.directory,
+                                    f"{day}.{kind}-{time.strftime('%H%M%S', time.localtime(timestamp))}.csv")
+        is_new = not os.path.exists(path)
+        f = open(path, "a", newline="", buffering=1)
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(header)
+        self.files[kind] = (day, f, writer)
+        return writer
+
+    def log_sample(self, timestamp, values):
+        """Record the filtered distance, dial and light readings."""
+        writer = self._writer("samples", timestamp, SAMPLE_FIELDS)
+        writer.writerow([f"{timestamp:.3f}"] + [f"{value:.1f}" for value in values[:3]])
+
+    def log_submission(self, timestamp, dial, active_areas):
+        """Record a submitted selection of active areas and the activity level."""
+        writer = self._writer("submissions", timestamp, ["time", "dial"] + self.areas)
+        writer.writerow([f"{timestamp:.3f}", f"{dial:.1f}"]
+                        + [1 if area in active_areas else 0 for area in self.areas])
+
+    def set_areas(self, areas):
+        """Change the area columns after a layout reload."""
+        areas = list(areas)
+        if areas != self.areas:
+            self.areas = areas
+            current = self.files.pop("submissions", None)
+            if current is not None:
+                current[1].close()
+
+    def close(self):
+        """Close all open files."""
+        for _, f, _ in self.files.values():
+            f.close()
+        self.files.clear()
+
+
+def open_panel_log(layout, base_dir):
+    """Create the PanelLog configured in a layout's "logging" section, or None."""
+    settings = layout.data.get("logging")
+    if not settings:
+        return None
+    directory = os.path.join(base_dir, settings.get("dir", "logs"))
+    return PanelLog(directory, settings.get("panel", "panel"), layout.touchpoint_positions)
@@ -0,0 +1,55 @@
+ACTIVE = "active"
+DIM = "dim"
+ASLEEP = "asleep"
+
+
+class PresenceMonitor:
+    """Decide from the distance reading and touches whether anyone is at the panel.
+
+    The distance sensor reads higher the closer someone stands. A reading at
+    or above "near" counts as present, and it has to drop "hysteresis" below
+    that before the area counts as empty again. After "dim_after" seconds
+    without presence or touches the panel dims, and after "sleep_after"
+    seconds it goes to sleep. Either of them can be left out to never dim or
+    sleep. Any presence or touch makes it active again at once.
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.near = settings.get("near", 300)
+        self.hysteresis = settings.get("hysteresis", 30)
+        self.dim_after = settings.get("dim_after")
+        self.sleep_after = settings.get("sleep_after")
+        self.present = False
+        self.last_seen = None
+        self.state = ACTIVE
+
+    def restore(self, other):
+        """Carry over the presence of a monitor this one replaces."""
+        self.present = other.present
+        self.last_seen = other.last_seen
+        self.state = other.state
+
+    def touch(self, now):
+        """Record touch activity."""
+        self.last_seen = now
+        self.state = ACTIVE
+
+    def update(self, now, distance):
+        """Feed the filtered distance reading and return the current state."""
+        if self.present:
+            self.present = distance >= self.near - self.hysteresis
+        else:
+            self.present = distance >= self.near
+
+        if self.present or self.last_seen is None:
+            self.last_seen = now
+        away = now - self.last_seen
+
+        if self.sleep_after is not None and away >= self.sleep_after:
+            self.state = ASLEEP
+        elif self.dim_after is not None and away >= self.dim_after:
+            self.state = DIM
+        else:
+            self.state = ACTIVE
+        return self.state
@@ -2,9 +2,12 @@ import glob
 import sys
 import serial
 
-def serial_ports():
+def serial_ports(extra_patterns=()):
     """ Lists serial port names
 
+        :param extra_patterns:
+            Additional glob patterns to probe, e.g. the links created by
+            panel_farm.py for its pseudo-terminals
         :raises EnvironmentError:
             On unsupported or unknown platforms
         :returns:
@@ -20,6 +23,9 @@ def serial_ports():
     else:
         raise EnvironmentError('Unsupported platform')
 
+    for pattern in extra_patterns:
+        ports += sorted(glob.glob(pattern))
+
     result = []
     for port in ports:
         try:
@@ -30,4 +36,5 @@ def serial_ports():
             pass
     return result
 
-print(serial_ports())
\ No newline at end of file
+if __name__ == '__main__':
+    print(serial_ports(sys.argv[1:]))
\ No newline at end of file
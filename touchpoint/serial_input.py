@@ -0,0 +1,105 @@
+import serial  # Make sure pyserial is installed for serial communication
+
+
+def parse_line(line):
+    """Parse a "distance,dial,light,touch,button" report from the panel into integers."""
+    data = list(map(int, line.split(',')))  # Convert all values to integers
+
+    # Ensure correct data format before proceeding
+    if len(data) < 5:
+        raise ValueError("Incomplete data received")
+    return data
+
+
+class LineReader:
+    """Split the panel's serial stream into complete lines without blocking.
+
+    The panel reports at a variable rate, so a frame may see no new line, a
+    partial line or a burst of several. Whatever bytes are waiting are read
+    at once and only complete lines are returned.
+    """
+
+    def __init__(self, ser, max_line_length=64):
+        self.ser = ser
+        self.max_line_length = max_line_length
+        self.buffer = bytearray()
+
+    def read_lines(self):
+        """Return the complete lines received since the last call."""
+        waiting = self.ser.in_waiting
+        if waiting:
+            self.buffer += self.ser.read(waiting)
+
+        lines = []
+        end = self.buffer.find(b'\n')
+        while end >= 0:
+            lines.append(self.buffer[:end].decode('utf-8', errors='replace').strip())
+            del self.buffer[:end + 1]
+            end = self.buffer.find(b'\n')
+
+        # Drop noise that never ends in a newline
+        if len(self.buffer) > self.max_line_length:
+            self.buffer.clear()
+        return lines
+
+
+class PanelConnection:
+    """Line reader for the panel's serial port that reopens it after a disconnect.
+
+    While the port is missing read_lines() returns no lines and retries the
+    port every retry_interval seconds, so the visualization keeps running
+    while the USB cable is replugged.
+    """
+
+    def __init__(self, port, baudrate, retry_interval=1.0):
+        self.port = port
+        self.baudrate = baudrate
+        self.retry_interval = retry_interval
+        self.ser = None
+        self.reader = None
+        self.next_attempt = 0.0
+        self.connects = 0
+        self.disconnects = 0
+        self.warned = False
+
+    def open(self):
+        """Try to open the port. Return True on success."""
+        try:
+            self.ser = serial.Serial(self.port, self.baudrate)
+        except (OSError, serial.SerialException) as e:
+            if not self.warned:  # Warn once, not on every retry
+                print(f"Warning: Could not open {self.port}: {e}")
+                self.warned = True
+            return False
+        self.reader = LineReader(self.ser)
+        self.connects += 1
+        self.warned = False
+        return True
+
+    def read_lines(self, now):
+        """Return the complete lines received since the last call."""
+        if self.ser is None:
+            if now < self.next_attempt:
+                return []
+            self.next_attempt = now + self.retry_interval
+            if not self.open():
+                return []
+
+        try:
+            return self.reader.read_lines()
+        except (OSError, serial.SerialException) as e:
+            print(f"Warning: Lost connection to {self.port}: {e}")
+            self.disconnects += 1
+            self.close()
+            self.next_attempt = now + self.retry_interval
+            return []
+
+    def close(self):
+        """Close the port if it is open."""
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except (OSError, serial.SerialException):
+                pass
+        self.ser = None
+        self.reader = None
@@ -0,0 +1,107 @@
+import os
+import struct
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+from gestures import KINDS, Gesture
+
+
+NUM_CHANNELS = 3  # Distance, dial and light
+NUM_PADS = 12  # MPR121 electrodes
+GESTURE_SLOTS = 16  # Recent gestures kept for the reader
+
+# A sequence number followed by the filtered sensor values, the number of
+# enter button presses, the number of gestures so far and the last gestures
+# as (kind, pad, start), gesture n in slot n % GESTURE_SLOTS. The writer
+# makes the sequence odd while it updates the fields (a seqlock), so readers
+# never need a lock and retry only if they raced a write.
+_SEQUENCE = struct.Struct("<Q")
+_STATE = struct.Struct(f"<{NUM_CHANNELS}dQQ{GESTURE_SLOTS * 3}B")
+SIZE = _SEQUENCE.size + _STATE.size
+
+PanelState = namedtuple("PanelState", "sequence values button_presses gesture_count gestures")
+
+
+def new_gestures(state, seen):
+    """Gestures of a state after the first "seen", dropping any already overwritten."""
+    first = max(seen, state.gesture_count - GESTURE_SLOTS)
+    return [state.gestures[n % GESTURE_SLOTS] for n in range(first, state.gesture_count)]
+
+
+def _attach(name):
+    """Open an existing shared memory block without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # Older Pythons track attached blocks too and would unlink this
+            # one when the attaching process exits
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedPanelState:
+    """Latest panel state in a shared memory block, written by one process.
+
+    Create it without a name in the process that owns the block, and open it
+    by name in the other process.
+    """
+
+    def __init__(self, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=SIZE)
+            self.shm.buf[:SIZE] = bytes(SIZE)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        self.name = self.shm.name
+
+        # Carry on from the state in the block, so a restarted writer keeps
+        # the counters going and its first state reads as new. The fields are
+        # read without the sequence check, since a writer that died mid
+        # update leaves the sequence odd for good.
+        self.sequence = (_SEQUENCE.unpack_from(self.shm.buf, 0)[0] + 1) & ~1
+        fields = _STATE.unpack_from(self.shm.buf, _SEQUENCE.size)
+        self.button_presses = fields[NUM_CHANNELS]
+        self.gesture_count = fields[NUM_CHANNELS + 1]
+        self.gesture_slots = list(fields[NUM_CHANNELS + 2:])
+
+    def add_gesture(self, gesture):
+        """Queue a gesture for the next publish."""
+        slot = self.gesture_count % GESTURE_SLOTS * 3
+        self.gesture_slots[slot:slot + 3] = [KINDS.index(gesture.kind), gesture.pad, gesture.start]
+        self.gesture_count += 1
+
+    def publish(self, values, button_presses):
+        """Write a new state. Only one process may publish."""
+        buf = self.shm.buf
+        self.sequence += 1  # Odd while the fields are being written
+        _SEQUENCE.pack_into(buf, 0, self.sequence)
+        _STATE.pack_into(buf, _SEQUENCE.size, *values, button_presses, self.gesture_count,
+                         *self.gesture_slots)
+        self.sequence += 1
+        _SEQUENCE.pack_into(buf, 0, self.sequence)
+
+    def read(self, retries=1000):
+        """Return a consistent PanelState, or None if the writer stayed mid update."""
+        buf = self.shm.buf
+        for _ in range(retries):
+            sequence = _SEQUENCE.unpack_from(buf, 0)[0]
+            if sequence & 1:
+                continue
+            fields = _STATE.unpack_from(buf, _SEQUENCE.size)
+            if _SEQUENCE.unpack_from(buf, 0)[0] == sequence:
+                slots = fields[NUM_CHANNELS + 2:]
+                gestures = [Gesture(KINDS[slots[i]], slots[i + 1], slots[i + 2])
+                            for i in range(0, len(slots), 3)]
+                return PanelState(sequence, fields[:NUM_CHANNELS], fields[NUM_CHANNELS],
+                                  fields[NUM_CHANNELS + 1], gestures)
+        return None
+
+    def close(self):
+        """Detach from the block, and remove it if this process created it."""
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,44 @@
+class GridIndex:
+    """Uniform grid over a set of rectangles for fast point hit-testing.
+
+    Every rectangle is registered in each grid cell it overlaps, so a hit-test
+    only looks at the few rectangles sharing the cell under the point instead
+    of every rectangle in the layout.
+    """
+
+    def __init__(self, rects, cell_size=None):
+        self.rects = list(rects)
+        if cell_size is None:
+            # Cells about twice the size of an average rectangle keep the
+            # number of rectangles per cell small without many empty cells
+            sizes = [max(rect.width, rect.height) for rect in self.rects]
+            cell_size = 2 * sum(sizes) / len(sizes) if sizes else 1
+        self.cell_size = max(1, int(cell_size))
+
+        self.cells = {}
+        for index, rect in enumerate(self.rects):
+            for cell in self._cells_for(rect):
+                self.cells.setdefault(cell, []).append(index)
+
+    def _cells_for(self, rect):
+        """Yield the grid cells a rectangle overlaps."""
+        size = self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield (cx, cy)
+
+    def query(self, x, y):
+        """Return the indices of rectangles sharing the cell under a point."""
+        return self.cells.get((int(x // self.cell_size), int(y // self.cell_size)), ())
+
+    def hit(self, x, y, accept=None):
+        """Return the index of the topmost rectangle containing a point, or -1.
+
+        If accept is given, rectangles for whose index it returns False are
+        skipped, so the caller can confirm a hit against the current shape.
+        """
+        # Later rectangles are drawn on top, so they win overlapping hits
+        for index in reversed(self.query(x, y)):
+            if self.rects[index].collidepoint(x, y) and (accept is None or accept(index)):
+                return index
+        return -1
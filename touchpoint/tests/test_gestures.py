@@ -0,0 +1,79 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestures import DOUBLE_TAP, LONG_PRESS, SWIPE, TAP, Gesture, GestureRecognizer
+
+
+def feed(recognizer, timeline):
+    """Feed (time, pad) samples and return the gestures with their times."""
+    gestures = []
+    for now, pad in timeline:
+        gesture = recognizer.update(now, pad)
+        if gesture is not None:
+            gestures.append((now, gesture))
+    return gestures
+
+
+def test_tap_is_reported_when_the_pad_goes_down():
+    recognizer = GestureRecognizer(12)
+    assert feed(recognizer, [(0.0, -1), (1.0, 3), (1.1, 3), (1.2, -1)]) == [
+        (1.0, Gesture(TAP, 3, 3)),
+    ]
+
+
+def test_second_tap_is_a_double_tap():
+    recognizer = GestureRecognizer(12)
+    gestures = feed(recognizer, [(1.0, 3), (1.1, -1), (1.3, 3), (1.4, -1), (1.6, 3)])
+    assert [gesture for _, gesture in gestures] == [
+        Gesture(TAP, 3, 3), Gesture(DOUBLE_TAP, 3, 3), Gesture(TAP, 3, 3),
+    ]
+
+
+def test_taps_too_far_apart_are_two_taps():
+    recognizer = GestureRecognizer(12)
+    gestures = feed(recognizer, [(1.0, 3), (1.1, -1), (2.0, 3)])
+    assert [gesture.kind for _, gesture in gestures] == [TAP, TAP]
+
+
+def test_contact_bounce_is_not_a_double_tap():
+    recognizer = GestureRecognizer(12)
+    gestures = feed(recognizer, [(1.0, 3), (1.1, -1), (1.12, 3), (1.2, -1)])
+    assert [gesture.kind for _, gesture in gestures] == [TAP]
+
+
+def test_bounce_does_not_restart_a_long_press():
+    recognizer = GestureRecognizer(12, {"long_press": 0.8})
+    gestures = feed(recognizer, [(1.0, 5), (1.5, -1), (1.52, 5)])
+    assert recognizer.poll(1.81) == Gesture(LONG_PRESS, 5, 5)
+    assert [gesture.kind for _, gesture in gestures] == [TAP]
+
+
+def test_long_press_is_reported_once_by_poll():
+    recognizer = GestureRecognizer(12, {"long_press": 0.8})
+    assert recognizer.update(1.0, 5) == Gesture(TAP, 5, 5)
+    assert recognizer.poll(1.5) is None
+    assert recognizer.poll(1.8) == Gesture(LONG_PRESS, 5, 5)
+    assert recognizer.poll(2.5) is None
+
+
+def test_swipe_across_neighbouring_pads():
+    recognizer = GestureRecognizer(12)
+    gestures = feed(recognizer, [(3.0, 0), (3.05, 1), (3.1, -1), (3.2, 2), (3.25, 3), (4.5, 3), (5.0, -1)])
+    assert [gesture for _, gesture in gestures] == [
+        Gesture(TAP, 0, 0), Gesture(SWIPE, 1, 0), Gesture(SWIPE, 2, 0), Gesture(SWIPE, 3, 0),
+    ]
+
+
+def test_no_swipe_after_a_long_press():
+    recognizer = GestureRecognizer(12, {"long_press": 0.8})
+    gestures = feed(recognizer, [(1.0, 7), (2.0, 7), (3.0, -1), (3.05, 6)])
+    assert [gesture for _, gesture in gestures] == [
+        Gesture(TAP, 7, 7), Gesture(LONG_PRESS, 7, 7), Gesture(TAP, 6, 6),
+    ]
+
+
+def test_pads_outside_the_panel_are_ignored():
+    recognizer = GestureRecognizer(12)
+    assert feed(recognizer, [(1.0, 20), (1.1, -5)]) == []
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from animation import Animator
+from filters import SmoothedChannel
+from timebase import VirtualClock
+from touch_point import DEBOUNCE, TouchPoint
+
+
+def make_touch_point(clock):
+    animator = Animator()
+    return TouchPoint(0, (100, 150), 20, animator, clock), animator
+
+
+def test_toggle_is_debounced():
+    clock = VirtualClock()
+    touch_point, animator = make_touch_point(clock)
+
+    # Too soon after creation
+    touch_point.toggle()
+    assert not touch_point.is_active
+
+    clock.advance(DEBOUNCE)
+    touch_point.toggle()
+    assert touch_point.is_active
+
+    # A bouncing contact within the debounce time is ignored
+    clock.advance(DEBOUNCE / 2)
+    touch_point.toggle()
+    assert touch_point.is_active
+
+    clock.advance(DEBOUNCE / 2)
+    touch_point.toggle()
+    assert not touch_point.is_active
+
+
+def test_toggle_animates_size():
+    clock = VirtualClock()
+    touch_point, animator = make_touch_point(clock)
+    clock.advance(DEBOUNCE)
+    touch_point.toggle()
+
+    clock.advance(0.05)
+    animator.update(clock.now())
+    assert 20 < touch_point.size < 40
+
+    clock.advance(0.11)
+    assert not animator.update(clock.now())
+    assert touch_point.size == 40
+
+
+def test_channel_ignores_jitter_over_a_long_session():
+    clock = VirtualClock()
+    channel = SmoothedChannel(window_size=1, deadband=3, hysteresis=2)
+    reported = []
+
+    # An hour of readings at 100 per second, jittering by one count around
+    # 500 and stepping to 600 after half an hour
+    for sample in range(360000):
+        base = 500 if sample < 180000 else 600
+        jitter = 1 if sample % 2 else -1
+        if channel.update(base + jitter):
+            reported.append((clock.now(), channel.value))
+        clock.tick(100)
+
+    assert [value for _, value in reported] == [499, 599]
+    assert abs(reported[1][0] - 1800) < 0.01
+    assert channel.change.suppressed == 360000 - 2
+
+
+def test_hysteresis_holds_a_reversal():
+    clock = VirtualClock()
+    channel = SmoothedChannel(window_size=1, deadband=2, hysteresis=3)
+    readings = [500, 510, 506, 505, 504, 498]
+    results = []
+    for reading in readings:
+        results.append(channel.update(reading))
+        clock.tick(100)
+    # Going back down needs more than 2 + 3 counts
+    assert results == [True, True, False, False, True, True]
@@ -0,0 +1,39 @@
+import pygame
+
+
+class NumberText:
+    """Render "<prefix><number>" readouts without rasterizing text every frame.
+
+    The prefix and the glyphs 0-9 are rendered once. A readout is composed by
+    blitting cached glyphs, and the finished surface is kept per value, so a
+    steady readout costs a dictionary lookup.
+    """
+
+    def __init__(self, font, prefix, color=(255, 255, 255), max_cached=2048):
+        self.prefix = font.render(prefix, True, color)
+        self.glyphs = {char: font.render(char, True, color) for char in "0123456789-"}
+        self.height = font.get_height()
+        self.max_cached = max_cached
+        self.cache = {}
+
+    def render(self, value):
+        """Return the readout surface for an integer value."""
+        text = self.cache.get(value)
+        if text is None:
+            if len(self.cache) >= self.max_cached:
+                self.cache.clear()
+            text = self.compose(value)
+            self.cache[value] = text
+        return text
+
+    def compose(self, value):
+        """Blit the prefix and digit glyphs for a value into a new surface."""
+        glyphs = [self.glyphs[char] for char in str(value)]
+        width = self.prefix.get_width() + sum(glyph.get_width() for glyph in glyphs)
+        text = pygame.Surface((width, self.height), pygame.SRCALPHA)
+        text.blit(self.prefix, (0, 0))
+        x = self.prefix.get_width()
+        for glyph in glyphs:
+            text.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return text
@@ -0,0 +1,59 @@
+import time
+import pygame
+
+
+class SystemClock:
+    """Real time clock that paces the main loop with a pygame clock."""
+
+    def __init__(self):
+        self.pygame_clock = pygame.time.Clock()
+
+    def now(self):
+        """Current time in seconds."""
+        return time.monotonic()
+
+    def timestamp(self):
+        """Current wall clock time as a Unix timestamp, for logs."""
+        return time.time()
+
+    def tick(self, fps):
+        """Wait for the next frame and return the milliseconds since the last one."""
+        return self.pygame_clock.tick(fps)
+
+    def sleep(self, seconds):
+        """Wait without drawing a frame."""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Clock that only moves when advanced, for simulations and tests.
+
+    Every component that reads the time through a clock object behaves the
+    same with this clock as with SystemClock, except that a whole session
+    can be stepped through as fast as the CPU allows.
+    """
+
+    def __init__(self, start=0.0, epoch=0.0):
+        self.time = start
+        self.epoch = epoch  # Unix time at virtual time 0
+
+    def now(self):
+        """Current virtual time in seconds."""
+        return self.time
+
+    def timestamp(self):
+        """Virtual wall clock time as a Unix timestamp."""
+        return self.epoch + self.time
+
+    def advance(self, seconds):
+        """Move the virtual time forward."""
+        self.time += seconds
+
+    def tick(self, fps):
+        """Advance by one frame at the given rate without sleeping."""
+        self.advance(1.0 / fps)
+        return 1000 // fps
+
+    def sleep(self, seconds):
+        """Advance without sleeping."""
+        self.advance(seconds)
@@ -0,0 +1,51 @@
+import colorsys
+
+import pygame
+
+
+DEBOUNCE = 0.2  # Seconds between two toggles of the same touch point
+
+
+# TouchPoint class represents a touch sensor on the screen
+class TouchPoint:
+    def __init__(self, index, position, size, animator, clock, color=None):
+        self.index = index
+        self.position = position
+        self.base_size = size
+        self.size = size
+        self.animator = animator
+        self.clock = clock
+        self.is_active = False
+        self.color = color if color is not None else self.get_color_from_index(index)
+        self.last_switch_time = clock.now()
+
+    def get_color_from_index(self, index):
+        """Generate a unique color for each touch point."""
+        rgb = colorsys.hsv_to_rgb(index / 12.0, 1.0, 1.0)
+        return (int(rgb[0] * 255), int(rgb[1] * 255), int(rgb[2] * 255))
+
+    def toggle(self):
+        """Toggle the touch point's active state with a debounce delay."""
+        current_time = self.clock.now()
+        if current_time - self.last_switch_time >= DEBOUNCE:
+            self.set_active(not self.is_active)
+
+    def set_active(self, active):
+        """Select or clear the touch point right away."""
+        if active != self.is_active:
+            current_time = self.clock.now()
+            self.is_active = active
+            target_size = self.base_size * 2 if self.is_active else self.base_size
+            self.animator.animate(self, "size", target_size, 0.15, current_time)
+            self.last_switch_time = current_time
+
+    def contains(self, point):
+        """Whether a logical point lies on the touch point at its current size."""
+        x, y = point
+        return (self.position[0] <= x < self.position[0] + self.size
+                and self.position[1] <= y < self.position[1] + self.size)
+
+    def render(self, screen, viewport):
+        """Draw the touch point on the screen."""
+        pygame.draw.rect(screen, self.color,
+                         viewport.rect(self.position[0], self.position[1], self.size, self.size))
@@ -1,68 +1,87 @@
+import os
+import sys
 import pygame
-import time
-import serial  # Make sure pyserial is installed for serial communication
 import colorsys
 
+from layout import LayoutWatcher
+from viewport import open_display
+from animation import Animator
+from timebase import SystemClock
+from text_cache import NumberText
+from touch_point import TouchPoint
+from filters import create_channels
+from serial_input import PanelConnection, parse_line
+from input_process import InputProcess
+from panel_log import open_panel_log
+from presence import ASLEEP, DIM, PresenceMonitor
+from capture import open_screen_capture
+from gestures import DOUBLE_TAP, LONG_PRESS, SWIPE, TAP, GestureRecognizer
+from shared_state import NUM_PADS, new_gestures
+
 
 # Initialize Pygame
 pygame.init()
 
-# Screen settings
-WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Touch Points Visualization")
-clock = pygame.time.Clock()
+# Layout file (pass another path on the command line to override)
+LAYOUT_PATH = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "layouts", "SP25.json")
+layout_watcher = LayoutWatcher(LAYOUT_PATH)
+layout = layout_watcher.layout
 
+# Screen settings (WIDTH and HEIGHT are in logical layout units)
+WIDTH, HEIGHT = layout.width, layout.height
+screen, viewport = open_display(layout)
+# Every time dependent part reads the time from this clock, so a VirtualClock
+# can replace it to step through a session faster than real time
+clock = SystemClock()
 
-# Serial communication setup (update with correct port)
-ser = serial.Serial('/dev/cu.usbmodem1401', 9600)
+# Size transitions of the touch points
+animator = Animator()
 
+# Dim and then blank the display while nobody is at the panel
+presence = PresenceMonitor(layout.data.get("presence"))
 
-# TouchPoint class represents a touch sensor on the screen
-class TouchPoint:
-    def __init__(self, index, position, size):
-        self.index = index
-        self.position = position
-        self.size = size
-        self.is_active = False
-        self.color = self.get_color_from_index(index)
-        self.last_switch_time = time.time()
+# Taps, double taps, long presses and swipes on the panel's pads
+gestures = GestureRecognizer(NUM_PADS, layout.data.get("gestures"))
 
-    def get_color_from_index(self, index):
-        """Generate a unique color for each touch point."""
-        rgb = colorsys.hsv_to_rgb(index / 12.0, 1.0, 1.0)
-        return (int(rgb[0] * 255), int(rgb[1] * 255), int(rgb[2] * 255))
 
-    def toggle(self):
-        """Toggle the touch point's active state with a debounce delay."""
-        current_time = time.time()
-        if current_time - self.last_switch_time >= 0.2:  # 200ms debounce
-            self.is_active = not self.is_active
-            self.size = self.size * 2 if self.is_active else self.size / 2
-            self.last_switch_time = current_time
+# Serial communication setup (update the port in the layout file)
+serial_settings = layout.data.get("serial", {})
+SERIAL_PORT = serial_settings.get("port", '/dev/cu.usbmodem1401')
+BAUDRATE = serial_settings.get("baudrate", 9600)
+if serial_settings.get("input_process", False):
+    # Read and filter the serial data in a separate process, which shares
+    # the latest panel state with this one
+    panel_input = InputProcess(SERIAL_PORT, BAUDRATE, LAYOUT_PATH)
+else:
+    panel_input = None
+    serial_reader = PanelConnection(SERIAL_PORT, BAUDRATE)
+
+# Daily logs of readings and submissions, if the layout enables them. With a
+# separate input process that process logs the readings.
+panel_log = open_panel_log(layout, os.path.dirname(os.path.abspath(__file__)))
+
+# Periodic screenshots for remote monitoring, if the layout enables them
+screen_capture = open_screen_capture(layout, os.path.dirname(os.path.abspath(__file__)))
 
-    def render(self, screen):
-        """Draw the touch point on the screen."""
-        pygame.draw.rect(screen, self.color,
-                         (self.position[0], self.position[1], int(self.size), int(self.size)))
 
 # SensorBar class represents a sensor value displayed as a bar
 class SensorBar:
-    def __init__(self, label, color, x, y, is_dial=False):
+    def __init__(self, label, color, x, y, font, channel, is_dial=False):
         self.label = label
         self.color = color
         self.position = (x, y)
-        self.values = []
-        self.window_size = 10  # Smoothing window
-        self.value = 0
+        self.channel = channel  # Smoothing and deadband of the readings
+        self.value = channel.value
         self.is_dial = is_dial
+        self.readout = NumberText(font, f"{label}: ")
 
     def update(self, new_value):
-        """Smooth sensor data by averaging the last few readings."""
-        self.values.append(new_value)
-        if len(self.values) > self.window_size:
-            self.values.pop(0)
-        self.value = sum(self.values) / len(self.values)
+        """Feed a new reading. Returns True when the displayed value changed."""
+        if self.channel.update(new_value):
+            self.value = self.channel.value
+            return True
+        return False
 
     def get_rainbow_color(self):
         """Convert sensor value to a rainbow color if it's a dial."""
@@ -74,101 +93,252 @@ class SensorBar:
         """Draw the sensor bar on the screen."""
         bar_color = self.get_rainbow_color() if self.is_dial else self.color
         bar_width = (self.value / 1023) * WIDTH
-        pygame.draw.rect(screen, bar_color, (self.position[0], self.position[1], bar_width, 30))
-
-        font = pygame.font.Font(None, 24)
-        text = font.render(f"{self.label}: {int(self.value)}", True, (255, 255, 255))
-        screen.blit(text, (self.position[0], self.position[1] - 20))
-
-# Define touch point positions
-touchpoint_positions = {
-    "Workbench 1": [(100, 150), (150, 150), (200, 150), (250, 150)],
-    "Workbench 2": [(400, 150), (450, 150), (500, 150), (550, 150)],
-    "3D Printer 1": [(300, 300), (350, 300)],
-    "3D Printer 2": [(500, 300), (550, 300)]
-}
-
-# Create touch points
-default_size = 20
-touch_points = [
-    TouchPoint(index, (x, y), default_size)
-    for index, positions in enumerate(touchpoint_positions.values())
-    for x, y in positions
-]
-
-def draw_labels():
-    """Draw the group labels above the touchpoints."""
-    font = pygame.font.Font(None, 28)
-    for label, positions in touchpoint_positions.items():
-        x, y = positions[0]
-        text = font.render(label, True, (255, 255, 255))
-        screen.blit(text, (x, y - 30))
-
-# Create sensor bars
-sensor_bars = [
-    SensorBar("Distance", (255, 0, 0), 50, 400),
-    SensorBar("Dial", (0, 255, 0), 50, 450, is_dial=True),
-    SensorBar("Light", (0, 0, 255), 50, 500)
-]
+        pygame.draw.rect(screen, bar_color, viewport.rect(self.position[0], self.position[1], bar_width, 30))
+
+        text = self.readout.render(int(self.value))
+        screen.blit(text, viewport.point(self.position[0], self.position[1] - 20))
+
+def create_touch_points(layout, previous=()):
+    """Create the touch points for a layout, keeping the state of existing ones."""
+    touch_points = [
+        TouchPoint(index, rect.topleft, layout.touch_point_size, animator, clock)
+        for index, rect in zip(layout.touch_groups, layout.touch_rects)
+    ]
+    for touch_point, old in zip(touch_points, previous):
+        touch_point.is_active = old.is_active
+        touch_point.color = old.color
+        touch_point.last_switch_time = old.last_switch_time
+        if old.is_active:
+            touch_point.size *= 2
+    return touch_points
+
+def create_sensor_bars(layout, previous=()):
+    """Create the sensor bars for a layout, keeping the readings of existing ones."""
+    font = layout.sensor_bar_font(viewport.scale)
+    channels = create_channels(layout.sensor_bars, [bar.channel for bar in previous])
+    return [
+        SensorBar(bar["label"], tuple(bar["color"]), bar["x"], bar["y"], font, channel,
+                  is_dial=bar.get("is_dial", False))
+        for bar, channel in zip(layout.sensor_bars, channels)
+    ]
+
+def create_dim_overlay():
+    """Translucent black layer drawn over the frame while the panel is dimmed."""
+    overlay = pygame.Surface(screen.get_size())
+    overlay.set_alpha(layout.data.get("presence", {}).get("dim_level", 160))
+    return overlay
+
+def apply_layout_changes(changed):
+    """Rebuild only the cached layers affected by a layout reload."""
+    global layout, screen, viewport, WIDTH, HEIGHT, static_layer, dim_overlay, touch_points, sensor_bars
+    global presence, gestures
+    layout = layout_watcher.layout
+    if "window" in changed:
+        WIDTH, HEIGHT = layout.width, layout.height
+        screen, viewport = open_display(layout)
+    if changed & {"window", "touchpoints", "text_boxes"}:
+        static_layer = layout.build_static_layer(viewport)
+    if changed & {"window", "presence"}:
+        dim_overlay = create_dim_overlay()
+    if "presence" in changed:
+        previous = presence
+        presence = PresenceMonitor(layout.data.get("presence"))
+        presence.restore(previous)
+    if "gestures" in changed:
+        previous = gestures
+        gestures = GestureRecognizer(NUM_PADS, layout.data.get("gestures"))
+        gestures.restore(previous)
+    if "touchpoints" in changed:
+        touch_points = create_touch_points(layout, touch_points)
+        if panel_log is not None:
+            panel_log.set_areas(layout.touchpoint_positions)
+    if changed & {"window", "sensor_bars"}:
+        sensor_bars = create_sensor_bars(layout, sensor_bars)
+
+# Create touch points, sensor bars and the background with labels
+touch_points = create_touch_points(layout)
+sensor_bars = create_sensor_bars(layout)
+static_layer = layout.build_static_layer(viewport)
+dim_overlay = create_dim_overlay()
+
+def submit_selection():
+    """Color the active touch points with the dial value and clear them."""
+    presence.touch(clock.now())
+    dial_value = sensor_bars[1].value
+    if panel_log is not None:
+        areas = list(layout.touchpoint_positions)
+        active_areas = {areas[touch_point.index] for touch_point in touch_points if touch_point.is_active}
+        panel_log.log_submission(clock.timestamp(), dial_value, active_areas)
+    for touch_point in touch_points:
+        if touch_point.is_active:
+            touch_point.color = colorsys.hsv_to_rgb(dial_value / 1023, 1, 1)
+            touch_point.color = tuple(int(c * 255) for c in touch_point.color)
+            touch_point.toggle()
+
+def apply_gesture(gesture):
+    """Change the selection for a gesture recognized on the panel."""
+    if gesture.pad >= len(touch_points):
+        return
+    presence.touch(clock.now())
+    if gesture.kind == TAP:
+        touch_points[gesture.pad].toggle()
+    elif gesture.kind == DOUBLE_TAP:
+        # Select every pad of the area
+        area = layout.touch_groups[gesture.pad]
+        for touch_point, group in zip(touch_points, layout.touch_groups):
+            if group == area:
+                touch_point.set_active(True)
+    elif gesture.kind == SWIPE:
+        # Select every pad swiped across
+        first, last = sorted((gesture.start, gesture.pad))
+        for touch_point in touch_points[first:last + 1]:
+            touch_point.set_active(True)
+    elif gesture.kind == LONG_PRESS:
+        # Clear the selection
+        for touch_point in touch_points:
+            touch_point.set_active(False)
 
 # Game loop
 running = True
+needs_redraw = True
+presence_state = presence.state
+last_sequence = 0
+seen_gestures = 0
+seen_button_presses = 0
+button_down = False
 while running:
-    screen.fill((0, 0, 0))  # Clear screen
+    # Pick up edits to the layout file without restarting
+    changed = layout_watcher.poll(clock.now())
+    if layout_watcher.layout is not layout:
+        apply_layout_changes(changed)
+        needs_redraw = True
 
     # Handle events (e.g., closing the window)
     for event in pygame.event.get():
+        needs_redraw = True  # Repaint after input or window changes
         if event.type == pygame.QUIT:
             running = False
-
-    # Read and process serial data from Arduino
-    if ser.in_waiting:
-        try:
-            line = ser.readline().decode('utf-8').strip()
-            data = list(map(int, line.split(',')))  # Convert all values to integers
-
-            # Ensure correct data format before proceeding
-            if len(data) < 5:
-                raise ValueError("Incomplete data received")
-
-            # Update touch points based on touch sensor data
-            touch_index = data[3]  
-            if 0 <= touch_index < len(touch_points):
-                touch_points[touch_index].toggle()
-
-            # Update sensor bars
-            for i in range(3):
-                sensor_bars[i].update(data[i])
-
-            # Check for button press and adjust touch point color
-            if data[4] == 0:  # Button is pressed
-                dial_value = sensor_bars[1].value
-                for touch_point in touch_points:
-                    if touch_point.is_active:
-                        touch_point.color = colorsys.hsv_to_rgb(dial_value / 1023, 1, 1)
-                        touch_point.color = tuple(int(c * 255) for c in touch_point.color)
-                        touch_point.toggle()
-
-        except (ValueError, IndexError):
-            print("Warning: Invalid or incomplete data received")
-
-    # Render touch points
-    for touch_point in touch_points:
-        touch_point.render(screen)
-
-    draw_labels()
-
-    # Render sensor bars
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.FINGERDOWN):
+            # Select touch points directly on a touchscreen or with the mouse
+            position = viewport.pointer_position(event)
+            if position is not None:
+                # Any press means someone is at the panel. On the blank
+                # screen of a sleeping panel it only wakes the panel up.
+                waking = presence_state == ASLEEP
+                presence.touch(clock.now())
+                touch_index = -1 if waking else layout.hit_index.hit(
+                    *position, accept=lambda index: touch_points[index].contains(position))
+                if touch_index >= 0:
+                    touch_points[touch_index].toggle()
+
+    if panel_input is not None:
+        # Apply the latest state published by the input process
+        state = panel_input.read(clock.now())
+        if state is not None and state.sequence != last_sequence:
+            last_sequence = state.sequence
+            for bar, value in zip(sensor_bars, state.values):
+                if bar.value != value:
+                    bar.value = value
+                    needs_redraw = True
+            for gesture in new_gestures(state, seen_gestures):
+                apply_gesture(gesture)
+            seen_gestures = state.gesture_count
+            # Counters only grow, so anything else is not a new press
+            if state.button_presses > seen_button_presses:
+                submit_selection()
+            seen_button_presses = state.button_presses
+    else:
+        # Read and process serial data from Arduino. The panel reports touches
+        # as they happen and otherwise sends a heartbeat, so there may be any
+        # number of lines waiting
+        for line in serial_reader.read_lines(clock.now()):
+            try:
+                data = parse_line(line)
+
+                # Update touch points based on touch sensor data
+                gesture = gestures.update(clock.now(), data[3])
+                if gesture is not None:
+                    apply_gesture(gesture)
+
+                # Update sensor bars
+                values_changed = False
+                for i in range(3):
+                    if sensor_bars[i].update(data[i]):
+                        values_changed = True
+                if values_changed:
+                    needs_redraw = True
+                    if panel_log is not None:
+                        panel_log.log_sample(clock.timestamp(), [bar.value for bar in sensor_bars])
+
+                # Check for button press and adjust touch point color. Reports
+                # repeat while the button is held, so only a new press counts
+                pressed = data[4] == 0
+                if pressed and not button_down:
+                    submit_selection()
+                button_down = pressed
+
+            except (ValueError, IndexError):
+                print("Warning: Invalid or incomplete data received")
+
+        # A held pad can become a long press between reports
+        gesture = gestures.poll(clock.now())
+        if gesture is not None:
+            apply_gesture(gesture)
+
+    # Wake up as soon as someone approaches, dim or sleep once they have left
+    if presence.update(clock.now(), sensor_bars[0].value) != presence_state:
+        presence_state = presence.state
+        needs_redraw = True
+
+    # Advance the size transitions, and only draw a frame when something changed
+    animating = animator.update(clock.now())
+    if presence_state == ASLEEP:
+        # Blank the display once and stop rendering until someone is back
+        if needs_redraw:
+            screen.fill((0, 0, 0))
+            pygame.display.flip()
+            needs_redraw = False
+    elif needs_redraw or animating:
+        screen.blit(static_layer, (0, 0))  # Clear screen and draw labels
+
+        # Render touch points
+        for touch_point in touch_points:
+            touch_point.render(screen, viewport)
+
+        # Render sensor bars
+        for bar in sensor_bars:
+            bar.draw(screen)
+
+        if presence_state == DIM:
+            screen.blit(dim_overlay, (0, 0))
+
+        # Update display
+        pygame.display.flip()
+        needs_redraw = False
+
+    if screen_capture is not None:
+        screen_capture.update(clock.now(), clock.timestamp(), screen)
+
+    # Poll the panel less often while asleep
+    clock.tick(layout.data.get("presence", {}).get("sleep_fps", 10) if presence_state == ASLEEP else 60)
+
+# Report how much sensor jitter the deadbands filtered out (the input
+# process reports its own when it runs the filters)
+if panel_input is None:
     for bar in sensor_bars:
-        bar.draw(screen)
-
-    # Update display
-    pygame.display.flip()
-    clock.tick(60)
+        change = bar.channel.change
+        print(f"{bar.label}: {change.changes} changes, {change.suppressed} updates suppressed")
 
 # Clean up
 pygame.quit()
-ser.close()
+if panel_log is not None:
+    panel_log.close()
+if screen_capture is not None:
+    screen_capture.close()
+if panel_input is not None:
+    panel_input.close()
+else:
+    serial_reader.close()
 
 
 
@@ -1,17 +1,36 @@
+import os
+import sys
 import pygame
-import time
 import serial  # Make sure pyserial is installed for serial communication
 import colorsys
 
+from layout import LayoutWatcher
+from viewport import open_display
+from animation import Animator
+from timebase import SystemClock
+from text_cache import NumberText
+from touch_point import TouchPoint
+from filters import create_channels
+
 
 # Initialize Pygame
 pygame.init()
 
-# Screen settings
-WIDTH, HEIGHT = 1000, 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Touch Points Visualization")
-clock = pygame.time.Clock()
+# Layout file (pass another path on the command line to override)
+LAYOUT_PATH = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "layouts", "SP25_noarduino.json")
+layout_watcher = LayoutWatcher(LAYOUT_PATH)
+layout = layout_watcher.layout
+
+# Screen settings (WIDTH and HEIGHT are in logical layout units)
+WIDTH, HEIGHT = layout.width, layout.height
+screen, viewport = open_display(layout)
+# Every time dependent part reads the time from this clock, so a VirtualClock
+# can replace it to step through a session faster than real time
+clock = SystemClock()
+
+# Size transitions of the touch points
+animator = Animator()
 
 
 #
@@ -24,51 +43,23 @@ clock = pygame.time.Clock()
 ### ser = serial.Serial('/dev/cu.usbmodem1401', 9600)
 
 
-# TouchPoint class represents a touch sensor on the screen
-class TouchPoint:
-    def __init__(self, index, position, size):
-        self.index = index
-        self.position = position
-        self.size = size
-        self.is_active = False
-        self.color = self.get_color_from_index(index)
-        self.last_switch_time = time.time()
-
-    def get_color_from_index(self, index):
-        """Generate a unique color for each touch point."""
-        rgb = colorsys.hsv_to_rgb(index / 12.0, 1.0, 1.0)
-        return (int(rgb[0] * 255), int(rgb[1] * 255), int(rgb[2] * 255))
-
-    def toggle(self):
-        """Toggle the touch point's active state with a debounce delay."""
-        current_time = time.time()
-        if current_time - self.last_switch_time >= 0.2:  # 200ms debounce
-            self.is_active = not self.is_active
-            self.size = self.size * 2 if self.is_active else self.size / 2
-            self.last_switch_time = current_time
-
-    def render(self, screen):
-        """Draw the touch point on the screen."""
-        pygame.draw.rect(screen, self.color,
-                         (self.position[0], self.position[1], int(self.size), int(self.size)))
-
 # SensorBar class represents a sensor value displayed as a bar
 class SensorBar:
-    def __init__(self, label, color, x, y, is_dial=False):
+    def __init__(self, label, color, x, y, font, channel, is_dial=False):
         self.label = label
         self.color = color
         self.position = (x, y)
-        self.values = []
-        self.window_size = 10  # Smoothing window
-        self.value = 0
+        self.channel = channel  # Smoothing and deadband of the readings
+        self.value = channel.value
         self.is_dial = is_dial
+        self.readout = NumberText(font, f"{label}: ")
 
     def update(self, new_value):
-        """Smooth sensor data by averaging the last few readings."""
-        self.values.append(new_value)
-        if len(self.values) > self.window_size:
-            self.values.pop(0)
-        self.value = sum(self.values) / len(self.values)
+        """Feed a new reading. Returns True when the displayed value changed."""
+        if self.channel.update(new_value):
+            self.value = self.channel.value
+            return True
+        return False
 
     def get_rainbow_color(self):
         """Convert sensor value to a rainbow color if it's a dial."""
@@ -80,70 +71,53 @@ class SensorBar:
         """Draw the sensor bar on the screen."""
         bar_color = self.get_rainbow_color() if self.is_dial else self.color
         bar_width = (self.value / 1023) * WIDTH / 2
-        pygame.draw.rect(screen, bar_color, (self.position[0], self.position[1], bar_width, 30))
-
-        font = pygame.font.Font(None, 24)
-        text = font.render(f"{self.label}: {int(self.value)}", True, (255, 255, 255))
-        screen.blit(text, (self.position[0], self.position[1] - 20))
-
-touchpoint_positions = {
-    # Arrange touchpoints for workbenches
-    "Workbench 1": [(100, 100)],
-    "Workbench 2": [(200, 150)],
-    "Workbench 3": [(300, 200)],
-    "Workbench 4": [(400, 100)],
-    "Workbench 5": [(500, 150)],
-    "Workbench 6": [(600, 200)],
-
-    # Arrange touchpoints for 3D printers in a separate area
-    "3D Printer 1": [(100, 400)],
-    "3D Printer 2": [(250, 400)],
-    "3D Printer 3": [(400, 400)],
-    "3D Printer 4": [(100, 470)],
-    "3D Printer 5": [(250, 470)],
-    "3D Printer 6": [(400, 470)],
-}
-
-# Create touch points
-default_size = 20
-touch_points = [
-    TouchPoint(index, (x, y), default_size)
-    for index, positions in enumerate(touchpoint_positions.values())
-    for x, y in positions
-]
-
-def draw_labels():
-    """Draw the group labels above the touchpoints."""
-    font = pygame.font.Font(None, 28)
-    for label, positions in touchpoint_positions.items():
-        x, y = positions[0]
-        text = font.render(label, True, (255, 255, 255))
-        screen.blit(text, (x, y - 30))
-
-# Create sensor bars
-sensor_bars = [
-    SensorBar("Distance", (255, 0, 0), 50, 600),
-    SensorBar("Dial", (0, 255, 0), 50, 650, is_dial=True),
-    SensorBar("Light", (0, 0, 255), 50, 700)
-]
-
-def draw_text_box(screen, x, y, width, height, text, text_color, border_color, border_thickness):
-    # Define the text box area
-    text_box_rect = pygame.Rect(x, y, width, height)
-
-    font = pygame.font.SysFont(None, 36)
-    
-    # Draw the text box border
-    pygame.draw.rect(screen, border_color, text_box_rect, border_thickness)
-    
-    # Render the text
-    text_surface = font.render(text, True, text_color)
-    
-    # Calculate text position within the text box
-    text_x = x + 10  # Offset by 10 pixels from the left
-    text_y = y + 10  # Offset by 10 pixels from the top
-    screen.blit(text_surface, (text_x, text_y))
-
+        pygame.draw.rect(screen, bar_color, viewport.rect(self.position[0], self.position[1], bar_width, 30))
+
+        text = self.readout.render(int(self.value))
+        screen.blit(text, viewport.point(self.position[0], self.position[1] - 20))
+
+def create_touch_points(layout, previous=()):
+    """Create the touch points for a layout, keeping the state of existing ones."""
+    touch_points = [
+        TouchPoint(index, rect.topleft, layout.touch_point_size, animator, clock)
+        for index, rect in zip(layout.touch_groups, layout.touch_rects)
+    ]
+    for touch_point, old in zip(touch_points, previous):
+        touch_point.is_active = old.is_active
+        touch_point.color = old.color
+        touch_point.last_switch_time = old.last_switch_time
+        if old.is_active:
+            touch_point.size *= 2
+    return touch_points
+
+def create_sensor_bars(layout, previous=()):
+    """Create the sensor bars for a layout, keeping the readings of existing ones."""
+    font = layout.sensor_bar_font(viewport.scale)
+    channels = create_channels(layout.sensor_bars, [bar.channel for bar in previous])
+    return [
+        SensorBar(bar["label"], tuple(bar["color"]), bar["x"], bar["y"], font, channel,
+                  is_dial=bar.get("is_dial", False))
+        for bar, channel in zip(layout.sensor_bars, channels)
+    ]
+
+def apply_layout_changes(changed):
+    """Rebuild only the cached layers affected by a layout reload."""
+    global layout, screen, viewport, WIDTH, HEIGHT, static_layer, touch_points, sensor_bars
+    layout = layout_watcher.layout
+    if "window" in changed:
+        WIDTH, HEIGHT = layout.width, layout.height
+        screen, viewport = open_display(layout)
+    if changed & {"window", "touchpoints", "text_boxes"}:
+        static_layer = layout.build_static_layer(viewport)
+    if "touchpoints" in changed:
+        touch_points = create_touch_points(layout, touch_points)
+    if changed & {"window", "sensor_bars"}:
+        sensor_bars = create_sensor_bars(layout, sensor_bars)
+
+# Create touch points, sensor bars and the background with labels and text boxes
+touch_points = create_touch_points(layout)
+sensor_bars = create_sensor_bars(layout)
+static_layer = layout.build_static_layer(viewport)
 
 
 #
@@ -234,13 +208,27 @@ line = '100,200,300,-1,1'
 
 # Game loop
 running = True
+needs_redraw = True
 while running:
-    screen.fill((0, 0, 0))  # Clear screen
+    # Pick up edits to the layout file without restarting
+    changed = layout_watcher.poll(clock.now())
+    if layout_watcher.layout is not layout:
+        apply_layout_changes(changed)
+        needs_redraw = True
 
     # Handle events (e.g., closing the window)
     for event in pygame.event.get():
+        needs_redraw = True  # Repaint after input or window changes
         if event.type == pygame.QUIT:
             running = False
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.FINGERDOWN):
+            # Select touch points directly on a touchscreen or with the mouse
+            position = viewport.pointer_position(event)
+            if position is not None:
+                touch_index = layout.hit_index.hit(
+                    *position, accept=lambda index: touch_points[index].contains(position))
+                if touch_index >= 0:
+                    touch_points[touch_index].toggle()
         else:
     # Read and process serial data from Arduino
     ### ser.in_waiting:
@@ -293,37 +281,29 @@ while running:
     #
     #
 
-# Draw the text box using the function
-    # Define colors
-    WHITE = (255, 255, 255)
-    BLACK = (0, 0, 0)
-    draw_text_box(
-        screen=screen,
-        x=600, 
-        y=500, 
-        width=400, 
-        height=300, 
-        text='Makerspace touchpoints...', 
-        text_color=WHITE, 
-        border_color=BLACK, 
-        border_thickness=2
-    )    
-
-
-    # Render touch points
-    for touch_point in touch_points:
-        touch_point.render(screen)
-
-    draw_labels()
-
-    # Render sensor bars
-    for bar in sensor_bars:
-        bar.draw(screen)
-
-    # Update display
-    pygame.display.flip()
+    # Advance the size transitions, and only draw a frame when something changed
+    animating = animator.update(clock.now())
+    if needs_redraw or animating:
+        screen.blit(static_layer, (0, 0))  # Clear screen and draw labels and text boxes
+
+        # Render touch points
+        for touch_point in touch_points:
+            touch_point.render(screen, viewport)
+
+        # Render sensor bars
+        for bar in sensor_bars:
+            bar.draw(screen)
+
+        # Update display
+        pygame.display.flip()
+        needs_redraw = False
     clock.tick(60)
 
+# Report how much sensor jitter the deadbands filtered out
+for bar in sensor_bars:
+    change = bar.channel.change
+    print(f"{bar.label}: {change.changes} changes, {change.suppressed} updates suppressed")
+
 # Clean up
 pygame.quit()
 ### ser.close()
@@ -3,29 +3,95 @@
 
 Adafruit_MPR121 capSensor = Adafruit_MPR121();
 
+// Reporting settings
+const int NUM_ANALOG = 3;
+const int analogPins[NUM_ANALOG] = {A2, A1, A0};  // Distance, dial, light
+const int ANALOG_THRESHOLD = 4;           // Report when an averaged reading moves this much
+const unsigned long SAMPLE_WINDOW = 10;   // ms of oversampling per averaged reading
+const unsigned long HEARTBEAT = 1000;     // ms between reports when nothing changes
+// 9600 baud carries about 45 reports per second, so sensor-only reports are
+// spaced out to keep the transmit buffer empty for touch and button reports
+const unsigned long ANALOG_INTERVAL = 40; // ms between reports of sensor changes
+
+// Oversampling state
+long sampleSum[NUM_ANALOG];
+int sampleCount = 0;
+unsigned long windowStart = 0;
+
+// Last values sent to the host
+int filtered[NUM_ANALOG];
+int reported[NUM_ANALOG];
+int reportedShape = -2;
+int reportedButton = -1;
+unsigned long lastReport = 0;
+
 void setup() {
   Serial.begin(9600);
   pinMode(2, INPUT_PULLUP);
-  
+
   Wire.begin();
-  
+
   if (!capSensor.begin(0x5A)) {
     Serial.println("MPR121 not found!");
     while (1);
   }
+
+  for (int i = 0; i < NUM_ANALOG; i++) {
+    filtered[i] = analogRead(analogPins[i]);
+    reported[i] = -1;
+    sampleSum[i] = 0;
+  }
+  windowStart = millis();
+}
+
+void sendReport(int shapeID, int enter_button) {
+  // Send data as CSV
+  Serial.print(filtered[0]);
+  Serial.print(",");
+  Serial.print(filtered[1]);
+  Serial.print(",");
+  Serial.print(filtered[2]);
+  Serial.print(",");
+  Serial.print(shapeID);
+  Serial.print(",");
+  Serial.println(enter_button);
+
+  for (int i = 0; i < NUM_ANALOG; i++) {
+    reported[i] = filtered[i];
+  }
+  reportedShape = shapeID;
+  reportedButton = enter_button;
+  lastReport = millis();
 }
 
 void loop() {
-  // Read analog sensors
-  int sensorA2 = analogRead(A2);
-  int sensorA1 = analogRead(A1);
-  int sensorA0 = analogRead(A0);
+  // Oversample the analog sensors
+  for (int i = 0; i < NUM_ANALOG; i++) {
+    sampleSum[i] += analogRead(analogPins[i]);
+  }
+  sampleCount++;
+
+  unsigned long now = millis();
+  bool analogChanged = false;
+  if (now - windowStart >= SAMPLE_WINDOW) {
+    // Average the window and check whether it moved enough to report
+    for (int i = 0; i < NUM_ANALOG; i++) {
+      filtered[i] = (sampleSum[i] + sampleCount / 2) / sampleCount;
+      sampleSum[i] = 0;
+      if (abs(filtered[i] - reported[i]) >= ANALOG_THRESHOLD) {
+        analogChanged = true;
+      }
+    }
+    sampleCount = 0;
+    windowStart = now;
+  }
+
   int enter_button = digitalRead(2);
 
   // Read capacitive touch sensor
   uint16_t touched = capSensor.touched();
   int shapeID = -1; // Default (no key touched)
-  
+
   for (int i = 0; i < 12; i++) {
     if (touched & (1 << i)) {
       shapeID = i;  // Store first detected key
@@ -33,16 +99,13 @@ void loop() {
     }
   }
 
-  // Send data as CSV
-  Serial.print(sensorA2);
-  Serial.print(",");
-  Serial.print(sensorA1);
-  Serial.print(",");
-  Serial.print(sensorA0);
-  Serial.print(",");
-  Serial.print(shapeID);
-  Serial.print(",");
-  Serial.println(enter_button);
-  
-  delay(40);
+  // Report touches and button presses right away, sensor changes once
+  // averaged and at most every ANALOG_INTERVAL, and otherwise only a
+  // heartbeat. A held back sensor change is found again in a later window,
+  // because it is compared with the last reported values.
+  if (shapeID != reportedShape || enter_button != reportedButton
+      || (analogChanged && now - lastReport >= ANALOG_INTERVAL)
+      || now - lastReport >= HEARTBEAT) {
+    sendReport(shapeID, enter_button);
+  }
 }
@@ -0,0 +1,62 @@
+import pygame
+
+
+class Viewport:
+    """Map logical layout coordinates onto the pixels of the real display."""
+
+    def __init__(self, logical_size, display_size):
+        self.logical_width, self.logical_height = logical_size
+        self.width, self.height = display_size
+
+        # Keep the aspect ratio of the layout and center it on the display
+        self.scale = min(self.width / self.logical_width, self.height / self.logical_height)
+        self.offset_x = round((self.width - self.logical_width * self.scale) / 2)
+        self.offset_y = round((self.height - self.logical_height * self.scale) / 2)
+
+        # Scaled assets are cached under this key
+        self.key = (self.scale, self.offset_x, self.offset_y)
+
+    def length(self, n):
+        """Convert a logical length to display pixels."""
+        return max(1, round(n * self.scale))
+
+    def point(self, x, y):
+        """Convert a logical point to a display pixel position."""
+        return (self.offset_x + round(x * self.scale), self.offset_y + round(y * self.scale))
+
+    def rect(self, x, y, width, height):
+        """Convert a logical rectangle to a display rectangle."""
+        left, top = self.point(x, y)
+        return pygame.Rect(left, top, round(width * self.scale), round(height * self.scale))
+
+    def to_logical(self, x, y):
+        """Convert a display pixel position back to logical coordinates."""
+        return ((x - self.offset_x) / self.scale, (y - self.offset_y) / self.scale)
+
+    def pointer_position(self, event):
+        """Logical position of a mouse click or finger touch, or None for other events."""
+        if event.type == pygame.FINGERDOWN:
+            # Finger positions are normalized to the window size
+            return self.to_logical(event.x * self.width, event.y * self.height)
+        if event.type == pygame.MOUSEBUTTONDOWN and not getattr(event, "touch", False):
+            # Skip the mouse events SDL synthesizes from touches
+            return self.to_logical(*event.pos)
+        return None
+
+
+def open_display(layout):
+    """Open the window described by a layout and return it with its viewport.
+
+    The "window" section of the layout may set "fullscreen" to fill the
+    desktop, or "display_size" to open a window of a different size than the
+    logical layout. Either way everything is drawn at native resolution.
+    """
+    window = layout.data["window"]
+    if window.get("fullscreen", False):
+        display_size = pygame.display.get_desktop_sizes()[0]
+        screen = pygame.display.set_mode(display_size, pygame.FULLSCREEN)
+    else:
+        display_size = tuple(window.get("display_size", (layout.width, layout.height)))
+        screen = pygame.display.set_mode(display_size)
+    pygame.display.set_caption(layout.caption)
+    return screen, Viewport((layout.width, layout.height), screen.get_size())